@@ -1,21 +1,28 @@
 import streamlit as st
 import os
+import sys
 import glob
-from sentence_transformers import SentenceTransformer
-import weaviate
 import pandas as pd
 import matplotlib.pyplot as plt
 import importlib.util
 
 # --- Utility to dynamically import modules from the CLI app ---
 def import_module_from_path(module_name, file_path):
+    # Streamlit reruns this script on every interaction; reuse the module loaded
+    # on the first run so module-level state (e.g. the resources registry) survives
+    if module_name in sys.modules:
+        return sys.modules[module_name]
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
     spec.loader.exec_module(module)
     return module
 
 # --- Paths ---
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../weaviate-benchmarking'))
+# The CLI modules import their sibling modules (pipeline, embedders, ...) by name
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
 DATASETS = glob.glob(os.path.join(BASE_DIR, '*.csv'))
 PLOT_LOGS = [
     'cpu_usage_log.txt',
@@ -27,6 +34,8 @@ PLOT_LOGS = [
 ]
 
 # --- Import CLI modules ---
+embedders = import_module_from_path('embedders', os.path.join(BASE_DIR, 'embedders.py'))
+resources = import_module_from_path('resources', os.path.join(BASE_DIR, 'resources.py'))
 ingest = import_module_from_path('ingest', os.path.join(BASE_DIR, 'ingest.py'))
 query_mod = import_module_from_path('query', os.path.join(BASE_DIR, 'query.py'))
 benchmark = import_module_from_path('benchmark', os.path.join(BASE_DIR, 'benchmark.py'))
@@ -42,18 +51,28 @@ st.title("Weaviate Benchmarking & Analytics Dashboard")
 st.sidebar.header("Configuration")
 dataset = st.sidebar.selectbox("Select dataset to ingest", [os.path.basename(f) for f in DATASETS])
 
-# List available sentence-transformers models (basic list, can be expanded)
-EMBED_MODELS = [
-    "sentence-transformers/all-MiniLM-L6-v2",
-    "sentence-transformers/all-mpnet-base-v2",
-    "sentence-transformers/paraphrase-MiniLM-L6-v2",
-    "sentence-transformers/distiluse-base-multilingual-cased-v2"
-]
-selected_model = st.sidebar.selectbox("Select embedding model", EMBED_MODELS)
+# Available sentence-transformers models (shared with `main.py bench-embed`)
+EMBED_MODELS = embedders.EMBED_MODELS
+embedder_backend = st.sidebar.selectbox("Embedding backend", embedders.EMBEDDER_BACKENDS)
+if embedder_backend.startswith("sentence-transformers"):
+    selected_model = st.sidebar.selectbox("Select embedding model", EMBED_MODELS)
+    embed_dim = embedders.DEFAULT_HASH_DIMENSION
+else:
+    embed_dim = st.sidebar.number_input("Vector dimension", min_value=8, max_value=4096, value=embedders.DEFAULT_HASH_DIMENSION)
+    selected_model = f"hash-{embed_dim}"
+
+# One client per URL and one embedder per model for the whole server process,
+# shared by every session and rerun and handed to the CLI functions below
+@st.cache_resource
+def get_client(url=resources.DEFAULT_WEAVIATE_URL):
+    return resources.get_client(url)
 
-# Connect to Weaviate
-client = weaviate.Client("http://localhost:8080")
-embed_model = SentenceTransformer(selected_model)
+@st.cache_resource
+def get_embed_model(backend, model_name, dimension):
+    return resources.get_embed_model(backend, model_name, dimension)
+
+client = get_client()
+embed_model = get_embed_model(embedder_backend, selected_model, embed_dim)
 
 # --- Tabs for features ---
 tabs = st.tabs(["Ingest Data", "Query", "Update", "Delete", "Benchmark", "Plots", "Metrics"])
@@ -65,10 +84,8 @@ with tabs[0]:
     st.write(f"Selected embedding model: `{selected_model}`")
     if st.button("Ingest Data"):
         with st.spinner("Ingesting data and monitoring resources..."):
-            # Patch ingest.py to use selected model
-            ingest.embed_model = embed_model
             csv_path = os.path.join(BASE_DIR, dataset)
-            ingest.insert_ip_flows(csv_path)
+            ingest.insert_ip_flows(csv_path, embed_model=embed_model, client=client)
         st.success("Ingestion complete!")
 
 # --- Query Tab ---
@@ -78,8 +95,7 @@ with tabs[1]:
     limit = st.number_input("Number of results", min_value=1, max_value=20, value=5)
     if st.button("Run Query"):
         with st.spinner("Querying Weaviate..."):
-            query_mod.embed_model = embed_model
-            result = query_mod.semantic_query_ip_flow(query_text, limit=limit)
+            result = query_mod.semantic_query_ip_flow(query_text, limit=limit, embed_model=embed_model, client=client)
             st.write(result)
 
 # --- Update Tab ---
@@ -88,20 +104,27 @@ with tabs[2]:
     protocol = st.text_input("Protocol to update (e.g., TCP)")
     new_size = st.number_input("New frame length", min_value=1, value=1500)
     batch_size = st.number_input("Batch size", min_value=1, value=100)
+    reembed = st.checkbox("Re-embed updated flows with the selected model")
     if st.button("Update Records"):
         with st.spinner("Updating records..."):
-            query_mod.update_ip_flow(protocol, new_size, batch_size=batch_size)
+            query_mod.update_ip_flow(protocol, new_size, batch_size=batch_size, reembed=reembed,
+                                     embed_model=embed_model, client=client)
         st.success("Update complete!")
 
 # --- Delete Tab ---
 with tabs[3]:
     st.header("Delete IP Flow Records by Protocol")
     protocol = st.text_input("Protocol to delete (e.g., TCP)", key="delete_protocol")
-    batch_size = st.number_input("Batch size", min_value=1, value=100, key="delete_batch")
+    dry_run = st.checkbox("Dry run (only count matches)", key="delete_dry_run")
     if st.button("Delete Records"):
         with st.spinner("Deleting records..."):
-            query_mod.delete_ip_flow(protocol, batch_size=batch_size)
-        st.success("Delete complete!")
+            stats = query_mod.delete_ip_flow(protocol, dry_run=dry_run, output="verbose", client=client)
+        if stats is None:
+            st.error("Delete failed, see the server log")
+        elif dry_run:
+            st.info(f"{stats['matched']} records match ({stats['requests']} delete requests)")
+        else:
+            st.success(f"Delete complete! {stats['deleted']} records deleted in {stats['requests']} requests, {stats['failed']} failed")
     st.divider()
     st.header("Delete All Schema (Danger Zone)")
     if st.button("Delete All Schema"):
@@ -119,7 +142,8 @@ with tabs[4]:
             with st.spinner("Running benchmarks..."):
                 results = []
                 for q in query_list:
-                    benchmark_result = benchmark.benchmark_query(query_mod.semantic_query_ip_flow, q)
+                    benchmark_result = benchmark.benchmark_query(query_mod.semantic_query_ip_flow, q,
+                                                                 embed_model=embed_model, client=client)
                     results.append(benchmark_result)
                 st.write(results)
         else:
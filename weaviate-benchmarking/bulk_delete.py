@@ -0,0 +1,131 @@
+# bulk_delete.py - server-side delete-by-filter through the batch API
+#
+# One DELETE /v1/batch/objects request removes every object matching a where
+# filter, up to the server's per-request cap (QUERY_MAXIMUM_RESULTS, 10000 by
+# default). Repeating the request until nothing matches deletes any number of
+# objects in N/cap round trips instead of one per object.
+#
+# delete_where_parallel trades the single request stream for concurrency: the
+# after cursor streams id pages and each page becomes its own batch delete
+# ("id in page AND where"), run by parallel.run_operations.
+import functools
+import math
+import time
+
+from parallel import WeaviateSession, run_operations, print_worker_stats
+from scan import scan_class
+
+
+def count_where(client, class_name, where):
+    """Exact number of objects matching `where`, from an Aggregate meta count"""
+    response = client.query.aggregate(class_name).with_where(where).with_meta_count().do()
+    if "errors" in response:
+        raise RuntimeError(f"Aggregate on {class_name} failed: {response['errors']}")
+    return response["data"]["Aggregate"][class_name][0]["meta"]["count"]
+
+
+def _failed_objects(results):
+    return [(obj.get("id"), "; ".join(error.get("message", "") for error in (obj.get("errors") or {}).get("error", [])))
+            for obj in results.get("objects") or [] if obj.get("status") == "FAILED"]
+
+
+def delete_where(client, class_name, where, dry_run=False, output="minimal", max_requests=None):
+    """
+    Delete every object of `class_name` matching `where`, one capped batch
+    request at a time until a request matches fewer objects than the cap.
+
+    dry_run counts the matches (and the requests the delete would take)
+    without removing anything. output="verbose" makes the server list each
+    object's id and status, so failures can be reported by id; "minimal"
+    only returns the counts. Returns a stats dict.
+    """
+    stats = {'requests': 0, 'matched': 0, 'deleted': 0, 'failed': 0, 'failed_objects': [], 'seconds': 0.0}
+    start = time.time()
+
+    if dry_run:
+        response = client.batch.delete_objects(class_name, where, output=output, dry_run=True)
+        results = response["results"]
+        stats['matched'] = count_where(client, class_name, where)
+        stats['requests'] = math.ceil(stats['matched'] / results["limit"]) if results["limit"] else 0
+        print(f"Dry run: {stats['matched']} {class_name} objects match; the server deletes up to "
+              f"{results['limit']} per request, so this takes {stats['requests']} requests")
+        if output == "verbose":
+            for obj in (results.get("objects") or [])[:10]:
+                print(f"  would delete {obj.get('id')}")
+        stats['seconds'] = time.time() - start
+        return stats
+
+    while max_requests is None or stats['requests'] < max_requests:
+        request_start = time.time()
+        response = client.batch.delete_objects(class_name, where, output=output)
+        results = response["results"]
+        stats['requests'] += 1
+        stats['matched'] += results["matches"]
+        stats['deleted'] += results["successful"]
+        stats['failed'] += results["failed"]
+        if output == "verbose":
+            stats['failed_objects'].extend(_failed_objects(results))
+        print(f"Request {stats['requests']}: matched {results['matches']}, deleted {results['successful']}, "
+              f"failed {results['failed']} ({time.time() - request_start:.2f}s)")
+        if results["matches"] < results["limit"]:
+            break  # Everything left fitted under the cap
+        if results["successful"] == 0:
+            print("Nothing could be deleted in the last request, stopping")
+            break
+
+    stats['seconds'] = time.time() - start
+    rate = stats['deleted'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"Deleted {stats['deleted']} {class_name} objects in {stats['requests']} requests "
+          f"({stats['seconds']:.2f}s, {rate:.0f} objects/sec), {stats['failed']} failed")
+    for object_id, message in stats['failed_objects'][:10]:
+        print(f"  failed {object_id}: {message}")
+    return stats
+
+
+def delete_where_parallel(client, class_name, where, page_size=1000, num_workers=4, max_in_flight=None,
+                          mode="threads", output="minimal", session=None):
+    """
+    Delete every object of `class_name` matching `where` with num_workers
+    concurrent batch deletes over `session` (default: a WeaviateSession to the
+    client's server, closed on return), one per cursor page of ids, at most
+    max_in_flight outstanding. `client` only drives the cursor. Returns the
+    same stats as delete_where plus per-worker stats; requests that failed as
+    a whole are counted in 'failed_requests' and listed in submission order
+    under 'errors'.
+    """
+    own_session = session is None
+    session = session or WeaviateSession.from_client(client, pool_size=num_workers)
+
+    def delete_page(ids):
+        page_where = {"operator": "And", "operands": [
+            {"path": ["id"], "operator": "ContainsAny", "valueTextArray": ids}, where]}
+        return session.batch_delete(class_name, page_where, output=output)["results"]
+
+    pages = scan_class(client, class_name, page_size=page_size)
+    operations = ((f"page {page_number}", functools.partial(delete_page, ids)) for page_number, ids in enumerate(pages, 1))
+    try:
+        run = run_operations(operations, num_workers=num_workers, max_in_flight=max_in_flight, mode=mode)
+    finally:
+        if own_session:
+            session.close()
+
+    results = run['results']
+    stats = {
+        'requests': run['operations'],
+        'matched': sum(result["matches"] for result in results),
+        'deleted': sum(result["successful"] for result in results),
+        'failed': sum(result["failed"] for result in results),
+        'failed_requests': len(run['errors']),
+        'failed_objects': [failed for result in results for failed in _failed_objects(result)] if output == "verbose" else [],
+        'errors': [(key, str(error)) for _, key, error in run['errors']],
+        'workers': run['workers'],
+        'seconds': run['seconds']
+    }
+    rate = stats['deleted'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"Deleted {stats['deleted']} {class_name} objects in {stats['requests']} requests "
+          f"({num_workers} workers, {mode}, {stats['seconds']:.2f}s, {rate:.0f} objects/sec), {stats['failed']} failed, "
+          f"{stats['failed_requests']} requests failed as a whole")
+    print_worker_stats(run)
+    for object_id, message in stats['failed_objects'][:10]:
+        print(f"  failed {object_id}: {message}")
+    return stats
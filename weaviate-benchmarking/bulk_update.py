@@ -0,0 +1,187 @@
+# bulk_update.py - update-by-query: a where filter plus a property patch
+#
+# Ids are streamed with the after cursor (scan.py). For each page of ids a
+# worker asks the server for the objects that match the filter AND still
+# differ from the patch, then writes them back patched:
+#
+# - write="batch" (the default, and always with revectorization) sends the
+#   page as one batch upsert with the fetched properties and vector. A batch
+#   write with an existing id replaces the whole object from the snapshot
+#   fetched for the page: any other property or vector written to that object
+#   between the fetch and the batch write is lost.
+# - write="patch" sends one PATCH per object instead, which merges only the
+#   patched properties and has no such window, at one request per object.
+#
+# The cursor cannot be combined with a filter, so every run pages through the
+# ids of the whole class (one cursor request per page, plus one filtered fetch
+# per page), however few objects match.
+import functools
+import threading
+import time
+
+from parallel import WeaviateSession, run_operations, print_worker_stats
+from scan import scan_class
+
+
+def _value_key(value):
+    if isinstance(value, bool):
+        return "valueBoolean"
+    if isinstance(value, int):
+        return "valueInt"
+    if isinstance(value, float):
+        return "valueNumber"
+    return "valueString"
+
+
+def patch_filter(where, patch):
+    """`where` narrowed to objects where at least one patched property is not yet the new value"""
+    differs = [{"path": [name], "operator": "NotEqual", _value_key(value): value} for name, value in patch.items()]
+    not_patched = differs[0] if len(differs) == 1 else {"operator": "Or", "operands": differs}
+    return not_patched if where is None else {"operator": "And", "operands": [where, not_patched]}
+
+
+def class_properties(client, class_name):
+    return [prop["name"] for prop in client.schema.get(class_name)["properties"]]
+
+
+def _batch_errors(results):
+    errors = []
+    for result in results or []:
+        for error in (result.get("result", {}).get("errors") or {}).get("error", []):
+            errors.append((result.get("id"), error.get("message")))
+    return errors
+
+
+UPDATE_WRITES = ["batch", "patch"]
+
+
+def update_id_pages(client, class_name, id_pages, where, patch, num_workers=4, max_in_flight=None, mode="threads",
+                    session=None, revectorize=None, write="batch", only_changed=True, verbose=True):
+    """
+    The write side of update_where, shared with keyed_crud.patch_by_ids: for
+    each list of ids from `id_pages`, fetch those matching `where` (and, with
+    only_changed, still differing from `patch`) in one filtered query and write
+    them back patched. Arguments as for update_where. Prints the per-worker
+    stats and returns totals, one entry per batch and the worker stats.
+    """
+    if write not in UPDATE_WRITES:
+        raise ValueError(f"Unknown write mode '{write}', expected one of {UPDATE_WRITES}")
+    if write == "patch" and revectorize is not None:
+        raise ValueError("Re-embedding writes vectors, which needs write='batch'")
+    own_session = session is None
+    session = session or WeaviateSession.from_client(client, pool_size=num_workers)
+    properties = class_properties(client, class_name)
+    server_filter = patch_filter(where, patch) if only_changed else where
+
+    def update_page(batch_number, ids):
+        batch_start = time.perf_counter()
+        # Only objects of this page that match (and still need the change) come back;
+        # a batch upsert needs the full snapshot, a PATCH only the id
+        id_filter = {"path": ["id"], "operator": "ContainsAny", "valueTextArray": ids}
+        query = (
+            client.query
+            .get(class_name, properties if write == "batch" else [])
+            .with_where(id_filter if server_filter is None else {"operator": "And", "operands": [id_filter, server_filter]})
+            .with_additional(["id", "vector"] if write == "batch" else ["id"])
+            .with_limit(len(ids))
+            .build()
+        )
+        response = session.graphql(query)
+        objects = [{
+            'id': obj["_additional"]["id"],
+            'vector': obj["_additional"].get("vector"),
+            'properties': {**{name: obj.get(name) for name in properties}, **patch}
+        } for obj in response.get("data", {}).get("Get", {}).get(class_name, [])]
+        fetch_seconds = time.perf_counter() - batch_start
+
+        embed_seconds = 0.0
+        errors = []
+        if write == "patch":
+            for obj in objects:
+                try:
+                    session.patch_object(class_name, obj['id'], patch)
+                except Exception as e:
+                    errors.append((obj['id'], str(e)))
+        elif objects:
+            if revectorize is not None:
+                embed_start = time.perf_counter()
+                for obj, vector in zip(objects, revectorize(objects)):
+                    obj['vector'] = vector
+                embed_seconds = time.perf_counter() - embed_start
+            # The fetched vector goes back unchanged unless it was just rebuilt
+            errors = _batch_errors(session.batch_objects([dict(obj, **{'class': class_name}) for obj in objects]))
+        seconds = time.perf_counter() - batch_start
+        batch_stats = {
+            'batch': batch_number,
+            'worker': threading.current_thread().name,
+            'ids': len(ids),
+            'matched': len(objects),
+            'updated': len(objects) - len(errors),
+            'failed': len(errors),
+            'errors': errors,
+            'fetch_seconds': fetch_seconds,
+            'embed_seconds': embed_seconds,
+            'seconds': seconds
+        }
+        if verbose and objects:
+            print(f"Batch {batch_number}: {batch_stats['updated']}/{len(ids)} ids updated in {seconds:.2f}s "
+                  f"({batch_stats['updated'] / seconds:.0f} objects/sec, fetch {fetch_seconds:.2f}s, "
+                  f"embed {embed_seconds:.2f}s), "
+                  f"{batch_stats['failed']} failed")
+        return batch_stats
+
+    operations = ((f"batch {batch_number}", functools.partial(update_page, batch_number, ids))
+                  for batch_number, ids in enumerate(id_pages, 1))
+    try:
+        run = run_operations(operations, num_workers=num_workers, max_in_flight=max_in_flight, mode=mode)
+    finally:
+        if own_session:
+            session.close()
+    print_worker_stats(run)
+
+    batches = run['results']
+    return {
+        'matched': sum(batch['matched'] for batch in batches),
+        'updated': sum(batch['updated'] for batch in batches),
+        'failed': sum(batch['failed'] for batch in batches),
+        'failed_batches': len(run['errors']),
+        # Per-object errors, then whole batches that failed, each in batch order
+        'errors': [error for batch in batches for error in batch['errors']] + [(key, str(error)) for _, key, error in run['errors']],
+        'batches': batches,
+        'workers': run['workers'],
+        'seconds': run['seconds']
+    }
+
+
+def update_where(client, class_name, where, patch, page_size=1000, num_workers=4, max_in_flight=None, mode="threads",
+                 session=None, revectorize=None, write="batch", verbose=True):
+    """
+    Apply `patch` (property -> new value) to every object of `class_name`
+    matching `where`. `client` drives the id cursor and builds the queries;
+    the per-page fetches and batch writes run on `session` (default: a
+    WeaviateSession to the client's server, closed on return) through parallel.run_operations with
+    num_workers workers, at most max_in_flight pages (default 2 x num_workers)
+    outstanding, in "threads" or "asyncio" mode.
+
+    write="batch" writes each page as one batch upsert (a full replace, see the
+    module header); write="patch" PATCHes each object. revectorize(objects),
+    if given, returns fresh vectors for a page of patched objects ({'id',
+    'properties', 'vector'} dicts), which are then written in the same batch
+    request as the new properties; it requires write="batch".
+
+    Returns a stats dict with totals, one entry per batch and per-worker stats.
+    """
+    scan_stats = {}
+    pages = scan_class(client, class_name, page_size=page_size, stats=scan_stats)
+    totals = update_id_pages(client, class_name, pages, where, patch, num_workers=num_workers,
+                             max_in_flight=max_in_flight, mode=mode, session=session, revectorize=revectorize,
+                             write=write, verbose=verbose)
+    stats = {'scanned': scan_stats.get('scanned', 0), **totals}
+    rate = stats['updated'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"Updated {stats['updated']} of {stats['matched']} matching {class_name} objects "
+          f"({stats['scanned']} scanned, {len(stats['batches'])} batches, {num_workers} workers, {mode}) "
+          f"in {stats['seconds']:.2f}s ({rate:.0f} objects/sec), {stats['failed']} failed, "
+          f"{stats['failed_batches']} batches errored")
+    for object_id, message in stats['errors'][:10]:
+        print(f"  failed {object_id}: {message}")
+    return stats
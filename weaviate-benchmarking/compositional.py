@@ -0,0 +1,85 @@
+# compositional.py - per-row vectors composed from cached per-field-value embeddings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# (field, phrase template, weight). frame_number and frame_time are left out on
+# purpose: they are unique per packet and would defeat the cache.
+FIELD_PHRASES = [
+    ("source_ip", "source {}", 1.0),
+    ("destination_ip", "destination {}", 1.0),
+    ("protocol", "protocol {}", 1.5),
+    ("source_port", "source port {}", 0.75),
+    ("destination_port", "destination port {}", 0.75),
+    ("frame_length", "{} bytes long", 0.5),
+]
+
+
+class CompositionalEmbedder:
+    """
+    Embeds each distinct field value ("source 185.125.190.82", "protocol TCP", ...)
+    once with the base embedder and keeps it in an LRU table. A row's vector is
+    the weighted sum of its field vectors, L2-normalised, so the base model is
+    only called for field values it has never seen.
+    """
+
+    def __init__(self, base_embedder, max_entries=100000):
+        self.base_embedder = base_embedder
+        self.name = f"compositional:{base_embedder.name}"
+        self.max_entries = max_entries
+        self.table = OrderedDict()  # phrase -> vector, oldest first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.base_embedder.get_sentence_embedding_dimension()
+
+    def encode(self, texts, batch_size=64):
+        # Free text (e.g. queries) goes straight to the base model, which shares the vector space
+        return self.base_embedder.encode(texts, batch_size=batch_size)
+
+    def _phrase_vectors(self, phrases, batch_size):
+        """Vectors for a list of distinct phrases, encoding only the unseen ones"""
+        missing = [phrase for phrase in phrases if phrase not in self.table]
+        self.misses += len(missing)
+        self.hits += len(phrases) - len(missing)
+        if missing:
+            encoded = np.asarray(self.base_embedder.encode(missing, batch_size=batch_size), dtype=np.float32)
+            for phrase, vector in zip(missing, encoded):
+                self.table[phrase] = vector
+        vectors = np.empty((len(phrases), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for index, phrase in enumerate(phrases):
+            self.table.move_to_end(phrase)
+            vectors[index] = self.table[phrase]
+        return vectors
+
+    def encode_flows(self, flow_data_list, batch_size=64):
+        frame = pd.DataFrame.from_records(flow_data_list)
+        vectors = np.zeros((len(frame), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for field, template, weight in FIELD_PHRASES:
+            if field not in frame:
+                continue
+            phrases = frame[field].astype(str).map(template.format)
+            codes, distinct = pd.factorize(phrases)
+            field_vectors = self._phrase_vectors(list(distinct), batch_size)
+            vectors += weight * field_vectors[codes]
+
+        # Evict only after the chunk is composed so its own entries stay available
+        while len(self.table) > self.max_entries:
+            self.table.popitem(last=False)
+            self.evictions += 1
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.table),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate_percent': (self.hits / lookups) * 100 if lookups else 0.0,
+            'evictions': self.evictions
+        }
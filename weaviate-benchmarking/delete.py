@@ -1,8 +1,6 @@
-import weaviate
+from resources import get_client
 
 
-client = weaviate.Client("http://localhost:8080")
-
 def delete_all_schema(client):
     schema = client.schema.get()
     classes = schema.get("classes", [])
@@ -20,8 +18,6 @@ def delete_all_schema(client):
 if __name__ == "__main__":
     confirm = input("WARNING: This will delete all schema classes and associated objects from Weaviate. Continue? (y/n): ")
     if confirm.lower() == 'y':
-        delete_all_schema(client)
+        delete_all_schema(get_client())
     else:
         print("Operation cancelled.")
-
-del client
\ No newline at end of file
@@ -0,0 +1,276 @@
+# embed_bench.py - embedding benchmarks that do not touch Weaviate
+import csv
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from embedders import EMBED_MODELS, get_embedder
+from flow_reader import read_ip_flow_chunks
+from flow_text import FLOW_TEXT_TEMPLATES
+
+
+def load_sample_rows(csv_file, rows):
+    sample = []
+    for chunk in read_ip_flow_chunks(csv_file, min(rows, 10000)):
+        sample.extend(chunk)
+        if len(sample) >= rows:
+            break
+    return sample[:rows]
+
+
+def default_query_set(rows):
+    """
+    Queries with known answers, derived from the sample itself: the most common
+    protocols, destination ports and source address. Each entry is
+    (query text, boolean relevance mask over the rows).
+    """
+    frame = pd.DataFrame.from_records(rows)
+    queries = []
+    for protocol in frame["protocol"].value_counts().index[:3]:
+        queries.append((f"{protocol} flows", (frame["protocol"] == protocol).to_numpy()))
+    ports = frame.loc[frame["destination_port"] > 0, "destination_port"].value_counts().index[:2]
+    for port in ports:
+        queries.append((f"traffic to port {port}", (frame["destination_port"] == port).to_numpy()))
+    source_ip = frame["source_ip"].value_counts().index[0]
+    queries.append((f"traffic from IP address {source_ip}", (frame["source_ip"] == source_ip).to_numpy()))
+    return queries
+
+
+def _normalise(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def precision_at_k(row_vectors, query_vectors, query_set, k):
+    """Mean share of relevant rows among the k nearest rows for each query"""
+    scores = _normalise(query_vectors) @ _normalise(row_vectors).T
+    precisions = []
+    for query_scores, (_, relevant) in zip(scores, query_set):
+        top = np.argsort(-query_scores)[:k]
+        precisions.append(float(relevant[top].mean()))
+    return precisions
+
+
+def benchmark_flow_templates(csv_file, embedder, rows=2000, batch_size=64, k=10, templates=None, output_file=None):
+    """
+    For each flow-text template: tokens per row, encode throughput and
+    precision@k on the default query set, all in-process.
+    """
+    sample = load_sample_rows(csv_file, rows)
+    query_set = default_query_set(sample)
+    query_vectors = embedder.encode([text for text, _ in query_set], batch_size=batch_size)
+    templates = templates or list(FLOW_TEXT_TEMPLATES)
+
+    print(f"Benchmarking {len(templates)} templates on {len(sample)} rows with {embedder.name} (k={k})")
+    for text, relevant in query_set:
+        print(f"  query '{text}': {int(relevant.sum())} relevant rows")
+
+    results = []
+    for template in templates:
+        texts = [FLOW_TEXT_TEMPLATES[template](row) for row in sample]
+        token_counts = embedder.count_tokens(texts)
+
+        embedder.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+        start_time = time.time()
+        row_vectors = embedder.encode(texts, batch_size=batch_size)
+        duration = time.time() - start_time
+
+        precisions = precision_at_k(row_vectors, query_vectors, query_set, k)
+        results.append({
+            'template': template,
+            'example': texts[0],
+            'mean_tokens': float(np.mean(token_counts)),
+            'max_tokens': int(np.max(token_counts)),
+            'rows_per_second': len(texts) / duration if duration > 0 else 0.0,
+            'mean_precision_at_k': float(np.mean(precisions)),
+            'precision_at_k': {text: precision for (text, _), precision in zip(query_set, precisions)}
+        })
+
+    print(f"\n{'template':<14}{'tokens/row':>12}{'max':>6}{'rows/sec':>12}{f'P@{k}':>8}")
+    for result in results:
+        print(f"{result['template']:<14}{result['mean_tokens']:>12.1f}{result['max_tokens']:>6}"
+              f"{result['rows_per_second']:>12.1f}{result['mean_precision_at_k']:>8.3f}")
+
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {output_file}")
+    return results
+
+
+def _timed_encode(embedder, texts, batch_size):
+    embedder.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    start_time = time.time()
+    vectors = embedder.encode(texts, batch_size=batch_size)
+    return vectors, time.time() - start_time
+
+
+def benchmark_quantization(csv_file, model_name, rows=2000, batch_size=64, k=10, queries=None, output_file=None):
+    """
+    Compare the float32 model with its dynamically quantized int8 copy on the
+    same sample: encode throughput, how close the vectors are, precision@k on
+    the default query set and recall@k of the int8 top-k against float32.
+    """
+    from embedders import SentenceTransformerEmbedder, QuantizedSentenceTransformerEmbedder
+    from flow_text import build_flow_text
+
+    sample = load_sample_rows(csv_file, rows)
+    texts = [build_flow_text(row) for row in sample]
+    query_set = default_query_set(sample)
+    query_texts = [text for text, _ in query_set] + list(queries or [])
+
+    float_embedder = SentenceTransformerEmbedder(model_name, device="cpu")
+    int8_embedder = QuantizedSentenceTransformerEmbedder(model_name)
+
+    print(f"Comparing float32 and int8 {model_name} on {len(texts)} rows, {len(query_texts)} queries (k={k})")
+    float_vectors, float_seconds = _timed_encode(float_embedder, texts, batch_size)
+    int8_vectors, int8_seconds = _timed_encode(int8_embedder, texts, batch_size)
+    float_queries = float_embedder.encode(query_texts, batch_size=batch_size)
+    int8_queries = int8_embedder.encode(query_texts, batch_size=batch_size)
+
+    float_vectors, int8_vectors = _normalise(float_vectors), _normalise(int8_vectors)
+    float_top = np.argsort(-(_normalise(float_queries) @ float_vectors.T), axis=1)[:, :k]
+    int8_top = np.argsort(-(_normalise(int8_queries) @ int8_vectors.T), axis=1)[:, :k]
+    recalls = [len(set(f_top) & set(i_top)) / k for f_top, i_top in zip(float_top, int8_top)]
+
+    result = {
+        'model': model_name,
+        'rows': len(texts),
+        'float32_rows_per_second': len(texts) / float_seconds,
+        'int8_rows_per_second': len(texts) / int8_seconds,
+        'speedup': float_seconds / int8_seconds,
+        'mean_vector_cosine': float(np.mean(np.sum(float_vectors * int8_vectors, axis=1))),
+        'float32_precision_at_k': float(np.mean(precision_at_k(float_vectors, float_queries[:len(query_set)], query_set, k))),
+        'int8_precision_at_k': float(np.mean(precision_at_k(int8_vectors, int8_queries[:len(query_set)], query_set, k))),
+        'int8_recall_at_k': {text: recall for text, recall in zip(query_texts, recalls)},
+        'mean_int8_recall_at_k': float(np.mean(recalls)),
+    }
+
+    print(f"float32: {result['float32_rows_per_second']:.1f} rows/sec")
+    print(f"int8:    {result['int8_rows_per_second']:.1f} rows/sec ({result['speedup']:.2f}x)")
+    print(f"Mean cosine(float32, int8): {result['mean_vector_cosine']:.4f}")
+    print(f"Precision@{k}: float32 {result['float32_precision_at_k']:.3f}, int8 {result['int8_precision_at_k']:.3f}")
+    print(f"Recall@{k} of int8 vs float32 neighbours: {result['mean_int8_recall_at_k']:.3f}")
+    for text, recall in result['int8_recall_at_k'].items():
+        print(f"  '{text}': {recall:.2f}")
+
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {output_file}")
+    return result
+
+
+class PeakRSSMonitor:
+    """Samples this process's RSS in a background thread and keeps the maximum"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self.process.memory_info().rss)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak_bytes = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self.process.memory_info().rss)
+
+
+def _set_torch_threads(threads):
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def measure_embedding(embedder, texts, batch_size):
+    """Encode texts batch by batch, timing every batch separately"""
+    embedder.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+    latencies = []
+    with PeakRSSMonitor() as monitor:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            batch_start = time.perf_counter()
+            embedder.encode(batch, batch_size=batch_size)
+            latencies.append(time.perf_counter() - batch_start)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'sentences_per_second': len(texts) / (latencies_ms.sum() / 1000),
+        'batch_latency_ms_mean': float(latencies_ms.mean()),
+        'batch_latency_ms_p50': float(np.percentile(latencies_ms, 50)),
+        'batch_latency_ms_p95': float(np.percentile(latencies_ms, 95)),
+        'batch_latency_ms_max': float(latencies_ms.max()),
+        'peak_rss_mb': monitor.peak_bytes / (1024 * 1024),
+    }
+
+
+def benchmark_embedding_sweep(csv_file, rows=2000, batch_sizes=(16, 32, 64, 128), thread_counts=None,
+                              models=None, backends=None, template="full", hash_dimension=384, output_file=None):
+    """
+    Embedding capacity sweep, independent of Weaviate: every backend x model x
+    torch thread count x batch size combination encodes the same sample.
+    Model-free backends (hash) ignore models and thread counts.
+    Results go to output_file as JSON, or CSV if the name ends in .csv.
+    """
+    sample = load_sample_rows(csv_file, rows)
+    texts = [FLOW_TEXT_TEMPLATES[template](row) for row in sample]
+    backends = backends or ["sentence-transformers", "hash"]
+    models = models or EMBED_MODELS[:1]
+    thread_counts = thread_counts or [psutil.cpu_count(logical=False) or 1]
+
+    print(f"Embedding sweep on {len(texts)} '{template}' texts: backends {backends}, "
+          f"{len(models)} models, threads {thread_counts}, batch sizes {list(batch_sizes)}")
+    results = []
+    for backend in backends:
+        transformer = backend.startswith("sentence-transformers")
+        for model_name in (models if transformer else [f"hash-{hash_dimension}"]):
+            rss_before_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+            embedder = get_embedder(backend, model_name, hash_dimension)
+            rss_loaded_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+            for threads in (thread_counts if transformer else [None]):
+                if threads is not None:
+                    _set_torch_threads(threads)
+                for batch_size in batch_sizes:
+                    measurement = measure_embedding(embedder, texts, batch_size)
+                    result = {
+                        'backend': backend,
+                        'model': embedder.name,
+                        'threads': threads,
+                        'batch_size': batch_size,
+                        'texts': len(texts),
+                        'model_load_rss_mb': rss_loaded_mb - rss_before_mb,
+                        **measurement
+                    }
+                    results.append(result)
+                    print(f"{backend:<27} {embedder.name:<48} threads={str(threads):<4} batch={batch_size:<4} "
+                          f"{result['sentences_per_second']:>9.1f} sent/s  p50 {result['batch_latency_ms_p50']:>8.2f} ms  "
+                          f"p95 {result['batch_latency_ms_p95']:>8.2f} ms  peak RSS {result['peak_rss_mb']:.0f} MB")
+            del embedder
+
+    if output_file:
+        if output_file.endswith(".csv"):
+            with open(output_file, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(results[0]))
+                writer.writeheader()
+                writer.writerows(results)
+        else:
+            with open(output_file, "w") as f:
+                json.dump(results, f, indent=2)
+        print(f"\nResults written to {output_file}")
+    return results
@@ -0,0 +1,254 @@
+# embed_server.py - long-lived embedding daemon on a Unix domain socket
+#
+# Loading a sentence-transformers model costs seconds; a one-shot `main.py query`
+# only needs a few milliseconds of encoding. The daemon keeps models loaded and
+# serves encode requests from any number of CLI processes, merging requests that
+# arrive within a short window into one encode() call (micro-batching).
+#
+# Wire format, both directions: 8-byte header (!II: JSON length, payload length),
+# a JSON object, then a raw payload. Responses to "encode" carry float32 vectors
+# as the payload; everything else travels in the JSON part.
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+DEFAULT_SOCKET_PATH = os.environ.get("FLOW_EMBED_SOCKET", "/tmp/flow-embed.sock")
+_HEADER = struct.Struct("!II")
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def send_message(sock, message, payload=b""):
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body), len(payload)) + body + payload)
+
+
+def recv_message(sock):
+    body_size, payload_size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    message = json.loads(_recv_exact(sock, body_size))
+    return message, _recv_exact(sock, payload_size) if payload_size else b""
+
+
+class MicroBatcher:
+    """
+    Serialises access to one embedder. Requests queued within max_wait_ms of
+    the first one (up to max_batch_texts texts) are encoded together and the
+    vectors are split back out to their callers.
+    """
+
+    def __init__(self, embedder, max_batch_texts=256, max_wait_ms=5.0):
+        self.embedder = embedder
+        self.max_batch_texts = max_batch_texts
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.stats = {'requests': 0, 'texts': 0, 'encode_calls': 0, 'encode_seconds': 0.0}
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, texts, batch_size=64):
+        pending = {'texts': texts, 'batch_size': batch_size, 'done': threading.Event(), 'vectors': None, 'error': None}
+        self.requests.put(pending)
+        pending['done'].wait()
+        if pending['error'] is not None:
+            raise pending['error']
+        return pending['vectors']
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        count = len(batch[0]['texts'])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_texts:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            count += len(pending['texts'])
+        return batch
+
+    def _run(self):
+        import numpy as np
+
+        while True:
+            batch = self._collect()
+            texts = [text for pending in batch for text in pending['texts']]
+            start = time.perf_counter()
+            try:
+                vectors = np.asarray(
+                    self.embedder.encode(texts, batch_size=max(pending['batch_size'] for pending in batch)),
+                    dtype=np.float32
+                )
+            except Exception as e:
+                for pending in batch:
+                    pending['error'] = e
+                    pending['done'].set()
+                continue
+            self.stats['requests'] += len(batch)
+            self.stats['texts'] += len(texts)
+            self.stats['encode_calls'] += 1
+            self.stats['encode_seconds'] += time.perf_counter() - start
+            offset = 0
+            for pending in batch:
+                pending['vectors'] = vectors[offset:offset + len(pending['texts'])]
+                offset += len(pending['texts'])
+                pending['done'].set()
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """One handler thread per client connection, one MicroBatcher per loaded model"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, max_batch_texts=256, max_wait_ms=5.0):
+        self.max_batch_texts = max_batch_texts
+        self.max_wait_ms = max_wait_ms
+        self.batchers = {}
+        self.load_lock = threading.Lock()
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+
+    def batcher(self, backend, model_name, dimension):
+        from embedders import get_embedder
+
+        key = (backend, model_name, dimension)
+        with self.load_lock:
+            if key not in self.batchers:
+                print(f"Loading {backend} embedder {model_name}...")
+                embedder = get_embedder(backend, model_name, dimension)
+                embedder.encode(["warm-up"], batch_size=1)
+                self.batchers[key] = MicroBatcher(embedder, self.max_batch_texts, self.max_wait_ms)
+            return self.batchers[key]
+
+    def stats(self):
+        return {batcher.embedder.name: dict(batcher.stats) for batcher in self.batchers.values()}
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                message, _ = recv_message(self.request)
+            except ConnectionError:
+                return
+            try:
+                self.respond(message)
+            except ConnectionError:
+                return
+            except Exception as e:
+                send_message(self.request, {"error": f"{type(e).__name__}: {e}"})
+
+    def respond(self, message):
+        op = message.get("op")
+        if op == "stats":
+            send_message(self.request, {"stats": self.server.stats()})
+            return
+        batcher = self.server.batcher(message["backend"], message["model_name"], message["dimension"])
+        embedder = batcher.embedder
+        if op == "info":
+            send_message(self.request, {"name": embedder.name, "dimension": embedder.get_sentence_embedding_dimension()})
+        elif op == "encode":
+            vectors = batcher.submit(message["texts"], message.get("batch_size", 64))
+            send_message(self.request, {"shape": list(vectors.shape)}, vectors.tobytes())
+        elif op == "count_tokens":
+            send_message(self.request, {"counts": embedder.count_tokens(message["texts"])})
+        else:
+            raise ValueError(f"Unknown op '{op}'")
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)  # Left behind by a server that did not shut down cleanly
+    else:
+        raise RuntimeError(f"An embedding server is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+def serve(socket_path=DEFAULT_SOCKET_PATH, preload=(), max_batch_texts=256, max_wait_ms=5.0):
+    """Run the daemon until interrupted. preload is a list of (backend, model_name, dimension)"""
+    server = EmbeddingServer(socket_path, max_batch_texts, max_wait_ms)
+    for options in preload:
+        server.batcher(*options)
+    print(f"Embedding server listening on {socket_path} (micro-batches up to {max_batch_texts} texts / {max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        for name, stats in server.stats().items():
+            print(f"{name}: {stats['requests']} requests, {stats['texts']} texts in {stats['encode_calls']} encode calls")
+
+
+class RemoteEmbedder:
+    """Client side of the daemon with the same interface as the local embedders"""
+
+    def __init__(self, backend, model_name, dimension, socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+        self.options = {"backend": backend, "model_name": model_name, "dimension": dimension}
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.lock = threading.Lock()
+        info, _ = self._request("info")
+        self.name = info["name"]
+        self.dimension = info["dimension"]
+
+    def _request(self, op, **fields):
+        with self.lock:
+            send_message(self.sock, {"op": op, **self.options, **fields})
+            message, payload = recv_message(self.sock)
+        if "error" in message:
+            raise RuntimeError(f"Embedding server: {message['error']}")
+        return message, payload
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, batch_size=64):
+        import numpy as np
+
+        single = isinstance(texts, str)
+        message, payload = self._request("encode", texts=[texts] if single else list(texts), batch_size=batch_size)
+        vectors = np.frombuffer(payload, dtype=np.float32).reshape(message["shape"])
+        return vectors[0] if single else vectors
+
+    def count_tokens(self, texts):
+        message, _ = self._request("count_tokens", texts=list(texts))
+        return message["counts"]
+
+    def close(self):
+        self.sock.close()
+
+
+def connect_embedder(backend, model_name, dimension, socket_path=DEFAULT_SOCKET_PATH):
+    """A RemoteEmbedder if a daemon is listening on socket_path, otherwise None"""
+    if not socket_path or not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        return RemoteEmbedder(backend, model_name, dimension, socket_path)
+    except (OSError, RuntimeError) as e:
+        print(f"Embedding server on {socket_path} unavailable ({e}), loading the model locally")
+        return None
@@ -0,0 +1,94 @@
+# embed_workers.py - process-pool embedding with shared-memory vector output
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Model instance owned by each worker process
+_worker_model = None
+
+
+def _init_worker(embedder_options, num_threads):
+    global _worker_model
+    from embedders import get_embedder
+
+    if embedder_options["backend"].startswith("sentence-transformers"):
+        import torch
+        torch.set_num_threads(num_threads)
+    _worker_model = get_embedder(**embedder_options)
+
+
+def _embedder_info():
+    return _worker_model.name, _worker_model.get_sentence_embedding_dimension()
+
+
+def _encode_slice(shm_name, shape, start, texts, batch_size):
+    """Encode texts and write them into rows [start, start + len(texts)) of the shared block"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        vectors = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        vectors[start:start + len(texts)] = _worker_model.encode(texts, batch_size=batch_size)
+        del vectors
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class SharedVectors:
+    """float32 vectors living in a shared-memory block; call release() once uploaded"""
+
+    def __init__(self, count, dimension):
+        self.shape = (count, dimension)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, count * dimension * 4))
+        self.array = np.ndarray(self.shape, dtype=np.float32, buffer=self.shm.buf)
+
+    def release(self):
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view is still alive (e.g. held by a traceback); the mapping goes with it
+            pass
+        self.shm.unlink()
+
+
+class EmbeddingPool:
+    """
+    N worker processes, each holding its own embedder (see embedders.get_embedder).
+    Texts are split into one slice per worker and the vectors come back
+    through shared memory rather than being pickled to the parent.
+    """
+
+    def __init__(self, embedder_options, num_workers, threads_per_worker=None):
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // num_workers)
+        self.num_workers = num_workers
+        self.pool = mp.get_context("spawn").Pool(
+            processes=num_workers,
+            initializer=_init_worker,
+            initargs=(dict(embedder_options), threads_per_worker)
+        )
+        self.name, self.dimension = self.pool.apply(_embedder_info)
+
+    def encode(self, texts, batch_size=64):
+        shared = SharedVectors(len(texts), self.dimension)
+        slice_size = -(-len(texts) // self.num_workers) if texts else 0
+        try:
+            pending = [
+                self.pool.apply_async(
+                    _encode_slice,
+                    (shared.shm.name, shared.shape, start, texts[start:start + slice_size], batch_size)
+                )
+                for start in range(0, len(texts), slice_size or 1)
+            ]
+            for result in pending:
+                result.get()
+        except Exception:
+            shared.release()
+            raise
+        return shared
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
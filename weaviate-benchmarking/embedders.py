@@ -0,0 +1,105 @@
+# embedders.py - pluggable text embedders used by ingest and query
+# numpy and the model libraries are imported on use so that main.py can read
+# the constants below without paying for them
+import re
+import zlib
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Models offered by the Streamlit app and swept by `main.py bench-embed`
+EMBED_MODELS = [
+    "sentence-transformers/all-MiniLM-L6-v2",
+    "sentence-transformers/all-mpnet-base-v2",
+    "sentence-transformers/paraphrase-MiniLM-L6-v2",
+    "sentence-transformers/distiluse-base-multilingual-cased-v2"
+]
+DEFAULT_HASH_DIMENSION = 384
+EMBEDDER_BACKENDS = ["sentence-transformers", "sentence-transformers-int8", "hash"]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_.:]+")
+
+
+class SentenceTransformerEmbedder:
+    """Thin wrapper so the transformer model exposes the same interface as the other backends"""
+
+    def __init__(self, model_name=DEFAULT_MODEL, device=None):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, batch_size=64):
+        return self.model.encode(texts, batch_size=batch_size)
+
+    def count_tokens(self, texts):
+        """Tokens per text as the model sees them (special tokens included, truncated to max_seq_length)"""
+        encoded = self.model.tokenizer(texts, truncation=True, max_length=self.model.max_seq_length)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+
+class QuantizedSentenceTransformerEmbedder(SentenceTransformerEmbedder):
+    """
+    The same model on CPU with every nn.Linear dynamically quantized to int8:
+    weights are stored as int8 and activations are quantized per batch at
+    run time. Trades a little accuracy for faster CPU inference.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        import torch
+
+        super().__init__(model_name, device="cpu")
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.name = f"{model_name}@int8"
+
+
+class HashEmbedder:
+    """
+    Deterministic, model-free embedder for measuring database cost on its own.
+    Word unigrams and bigrams are hashed (CRC32) into a signed vector of
+    `dimension` buckets which is then L2-normalised. Identical text always
+    gives the identical vector, in any process.
+    """
+
+    def __init__(self, dimension=DEFAULT_HASH_DIMENSION):
+        self.dimension = dimension
+        self.name = f"hash-{dimension}"
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def _features(self, text):
+        tokens = [token.strip(".:") for token in TOKEN_PATTERN.findall(text.lower())]
+        tokens = [token for token in tokens if token]
+        return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+    def count_tokens(self, texts):
+        return [len(TOKEN_PATTERN.findall(text.lower())) for text in texts]
+
+    def encode(self, texts, batch_size=64):
+        import numpy as np
+
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)), dtype=np.uint32)
+            if not len(hashes):
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], hashes % self.dimension, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1.0)
+        return vectors[0] if single else vectors
+
+
+def get_embedder(backend="sentence-transformers", model_name=DEFAULT_MODEL, dimension=DEFAULT_HASH_DIMENSION):
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(model_name)
+    if backend == "sentence-transformers-int8":
+        return QuantizedSentenceTransformerEmbedder(model_name)
+    if backend == "hash":
+        return HashEmbedder(dimension)
+    raise ValueError(f"Unknown embedder backend '{backend}', expected one of {EMBEDDER_BACKENDS}")
@@ -0,0 +1,153 @@
+# embedding_cache.py - persistent content-addressed cache of flow embeddings
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.json"
+DIRTY_FILE = "dirty"
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of float32 vectors keyed by (model name, hash of the flow text).
+
+    Each model gets its own directory holding a memory-mapped vector file with
+    a fixed number of slots and a JSON index mapping text hashes to slots in
+    least-recently-used order. When every slot is taken the least recently
+    used entry is evicted and its slot reused.
+
+    Slots are written in place but the index only on save(), so a marker file
+    exists from the first slot write until save(). A cache opened with the
+    marker present may map hashes to overwritten slots and is discarded.
+    """
+
+    def __init__(self, cache_dir, model_name, dimension, max_mb=512):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max(1, int(max_mb * 1024 * 1024) // (dimension * 4))
+        self.directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.entries = OrderedDict()  # text hash -> slot, oldest first
+        self.free_slots = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dirty_path = os.path.join(self.directory, DIRTY_FILE)
+
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        index = None
+        if os.path.exists(index_path) and os.path.exists(vectors_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            if index.get("dimension") != dimension or index.get("max_entries") != self.max_entries:
+                print(f"Embedding cache layout changed, discarding {self.directory}")
+                index = None
+            elif os.path.exists(self.dirty_path):
+                print(f"Embedding cache was not saved after its last write, discarding {self.directory}")
+                index = None
+        self.dirty = os.path.exists(self.dirty_path)
+
+        mode = "r+" if index is not None else "w+"
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(self.max_entries, dimension))
+        if index is not None:
+            self.entries.update((key, slot) for key, slot in index["entries"])
+        used = set(self.entries.values())
+        self.free_slots = [slot for slot in range(self.max_entries - 1, -1, -1) if slot not in used]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _allocate_slot(self):
+        if self.free_slots:
+            return self.free_slots.pop()
+        _, slot = self.entries.popitem(last=False)
+        self.evictions += 1
+        return slot
+
+    def get_many(self, texts):
+        """Return ({position: vector} for cached texts, [positions that missed])"""
+        found = {}
+        missing = []
+        for position, text in enumerate(texts):
+            key = text_key(text)
+            slot = self.entries.get(key)
+            if slot is None:
+                missing.append(position)
+                continue
+            self.entries.move_to_end(key)
+            found[position] = self.vectors[slot]
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def _mark_dirty(self):
+        if not self.dirty:
+            with open(self.dirty_path, "w"):
+                pass
+            self.dirty = True
+
+    def put_many(self, texts, vectors):
+        self._mark_dirty()
+        for text, vector in zip(texts, vectors):
+            key = text_key(text)
+            slot = self.entries.get(key)
+            if slot is None:
+                slot = self._allocate_slot()
+                self.entries[key] = slot
+            else:
+                self.entries.move_to_end(key)
+            self.vectors[slot] = vector
+
+    def encode(self, texts, encode_missing):
+        """
+        Vectors for all texts as a float32 array; only cache misses are passed
+        to encode_missing(list_of_texts), and its output is stored.
+        """
+        found, missing = self.get_many(texts)
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for position, vector in found.items():
+            vectors[position] = vector
+        if missing:
+            missing_texts = [texts[position] for position in missing]
+            new_vectors = np.asarray(encode_missing(missing_texts), dtype=np.float32)
+            vectors[missing] = new_vectors
+            self.put_many(missing_texts, new_vectors)
+        return vectors
+
+    def save(self):
+        self.vectors.flush()
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "model": self.model_name,
+                "dimension": self.dimension,
+                "max_entries": self.max_entries,
+                "entries": list(self.entries.items())
+            }, f)
+        os.replace(tmp_path, index_path)
+        if self.dirty:
+            os.remove(self.dirty_path)
+            self.dirty = False
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate_percent': (self.hits / lookups) * 100 if lookups else 0.0,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,139 @@
+# features.py - numeric flow feature vectors built straight from parsed columns
+import numpy as np
+import pandas as pd
+
+FEATURE_CLASS = "IPFlowFeatures"
+
+SUBNET_BUCKETS = 32
+KNOWN_PORTS = [20, 21, 22, 23, 25, 53, 67, 68, 80, 110, 123, 143, 161, 389, 443, 445, 514,
+               993, 995, 1433, 3306, 3389, 5432, 6379, 8080, 8443]
+# Extra port slots after KNOWN_PORTS: no port, other registered port, ephemeral port
+PORT_SLOTS = len(KNOWN_PORTS) + 3
+KNOWN_PROTOCOLS = ["TCP", "UDP", "ICMP", "DNS", "HTTP", "TLSV1.2", "TLSV1.3", "QUIC", "SSH", "ARP", "NTP", "SNMP"]
+PROTOCOL_SLOTS = len(KNOWN_PROTOCOLS) + 1
+LOG_MAX = np.log1p(65535)
+
+# (block, width, weight) - each block is unit-normalised, then scaled by its weight
+BLOCKS = [
+    ("source_octets", 4, 0.5),
+    ("destination_octets", 4, 0.5),
+    ("source_subnet", SUBNET_BUCKETS, 1.0),
+    ("destination_subnet", SUBNET_BUCKETS, 1.0),
+    ("source_port", PORT_SLOTS + 1, 1.0),
+    ("destination_port", PORT_SLOTS + 1, 1.0),
+    ("protocol", PROTOCOL_SLOTS, 1.5),
+    ("frame_length", 2, 0.75),
+    ("time_of_day", 2, 0.5),
+]
+FEATURE_DIMENSION = sum(width for _, width, _ in BLOCKS)
+
+_PORT_INDEX = {port: index for index, port in enumerate(KNOWN_PORTS)}
+_PROTOCOL_INDEX = {protocol: index for index, protocol in enumerate(KNOWN_PROTOCOLS)}
+
+
+def _octets(ips):
+    parts = ips.astype(str).str.extract(r"^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$")
+    return parts.astype(float).fillna(0.0).to_numpy() / 255.0
+
+
+def _subnet_one_hot(ips):
+    # /24 prefix, hashed with pandas' fixed-key hash so it is stable across runs
+    prefixes = ips.astype(str).str.rsplit(".", n=1).str[0].to_numpy(dtype=object)
+    buckets = (pd.util.hash_array(prefixes) % SUBNET_BUCKETS).astype(np.int64)
+    one_hot = np.zeros((len(ips), SUBNET_BUCKETS), dtype=np.float32)
+    one_hot[np.arange(len(ips)), buckets] = 1.0
+    return one_hot
+
+
+def _port_block(ports):
+    ports = pd.to_numeric(ports, errors="coerce").fillna(0).astype(np.int64)
+    slots = ports.map(_PORT_INDEX).to_numpy(dtype=float)
+    slots = np.where(np.isnan(slots), np.where(ports == 0, len(KNOWN_PORTS),
+                                                np.where(ports >= 32768, len(KNOWN_PORTS) + 2, len(KNOWN_PORTS) + 1)), slots)
+    block = np.zeros((len(ports), PORT_SLOTS + 1), dtype=np.float32)
+    block[np.arange(len(ports)), slots.astype(np.int64)] = 1.0
+    block[:, PORT_SLOTS] = np.log1p(ports.to_numpy()) / LOG_MAX
+    return block
+
+
+def _protocol_one_hot(protocols):
+    slots = protocols.astype(str).str.strip().str.upper().map(_PROTOCOL_INDEX).fillna(len(KNOWN_PROTOCOLS))
+    one_hot = np.zeros((len(protocols), PROTOCOL_SLOTS), dtype=np.float32)
+    one_hot[np.arange(len(protocols)), slots.to_numpy(dtype=np.int64)] = 1.0
+    return one_hot
+
+
+def _frame_length_block(lengths):
+    scaled = np.log1p(pd.to_numeric(lengths, errors="coerce").fillna(0).to_numpy(dtype=float)) / LOG_MAX
+    # Two phases of the same value so short and long frames point in different directions
+    return np.stack([np.cos(scaled * np.pi / 2), np.sin(scaled * np.pi / 2)], axis=1)
+
+
+def _time_of_day_block(frame_times):
+    clock = frame_times.astype(str).str.extract(r"(\d{1,2}):(\d{2}):(\d{2})").astype(float)
+    seconds = (clock[0] * 3600 + clock[1] * 60 + clock[2]).to_numpy()
+    angle = np.nan_to_num(seconds) / 86400.0 * 2 * np.pi
+    block = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+    block[np.isnan(seconds)] = 0.0
+    return block
+
+
+def _assemble(blocks):
+    """Concatenate named blocks in BLOCKS order; missing blocks stay zero"""
+    count = next(len(block) for block in blocks.values())
+    parts = []
+    for name, width, weight in BLOCKS:
+        block = blocks.get(name)
+        if block is None:
+            parts.append(np.zeros((count, width), dtype=np.float32))
+            continue
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        parts.append((block / np.where(norms > 0, norms, 1.0) * weight).astype(np.float32))
+    vectors = np.concatenate(parts, axis=1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def flow_feature_vectors(data_objects):
+    """Feature vectors (FEATURE_DIMENSION floats each) for a list of parsed IPFlow rows"""
+    frame = pd.DataFrame.from_records(data_objects)
+    return _assemble({
+        "source_octets": _octets(frame["source_ip"]),
+        "destination_octets": _octets(frame["destination_ip"]),
+        "source_subnet": _subnet_one_hot(frame["source_ip"]),
+        "destination_subnet": _subnet_one_hot(frame["destination_ip"]),
+        "source_port": _port_block(frame["source_port"]),
+        "destination_port": _port_block(frame["destination_port"]),
+        "protocol": _protocol_one_hot(frame["protocol"]),
+        "frame_length": _frame_length_block(frame["frame_length"]),
+        "time_of_day": _time_of_day_block(frame["frame_time"]),
+    })
+
+
+def query_feature_vector(source_ip=None, destination_ip=None, source_port=None, destination_port=None,
+                         protocol=None, frame_length=None, time_of_day=None):
+    """
+    Query vector in the same space as flow_feature_vectors. Only the fields
+    that are given are populated, so similarity is driven by those fields.
+    time_of_day is an 'HH:MM:SS' string.
+    """
+    blocks = {}
+    if source_ip is not None:
+        blocks["source_octets"] = _octets(pd.Series([source_ip]))
+        blocks["source_subnet"] = _subnet_one_hot(pd.Series([source_ip]))
+    if destination_ip is not None:
+        blocks["destination_octets"] = _octets(pd.Series([destination_ip]))
+        blocks["destination_subnet"] = _subnet_one_hot(pd.Series([destination_ip]))
+    if source_port is not None:
+        blocks["source_port"] = _port_block(pd.Series([source_port]))
+    if destination_port is not None:
+        blocks["destination_port"] = _port_block(pd.Series([destination_port]))
+    if protocol is not None:
+        blocks["protocol"] = _protocol_one_hot(pd.Series([protocol]))
+    if frame_length is not None:
+        blocks["frame_length"] = _frame_length_block(pd.Series([frame_length]))
+    if time_of_day is not None:
+        blocks["time_of_day"] = _time_of_day_block(pd.Series([time_of_day]))
+    if not blocks:
+        raise ValueError("At least one field is needed to build a feature query")
+    return _assemble(blocks)[0]
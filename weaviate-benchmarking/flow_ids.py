@@ -0,0 +1,20 @@
+# flow_ids.py - deterministic object UUIDs for ingested flows
+import os
+import uuid
+
+# Fixed namespace so the same dataset/key always maps to the same object
+FLOW_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "weaviate-benchmarking/ip-flows")
+
+
+def ip_flow_uuid(dataset_id, frame_number):
+    return str(uuid.uuid5(FLOW_NAMESPACE, f"{dataset_id}/{frame_number}"))
+
+
+def aggregate_flow_uuid(dataset_id, flow):
+    key = "/".join(str(flow[field]) for field in
+                   ("source_ip", "destination_ip", "source_port", "destination_port", "protocol"))
+    return str(uuid.uuid5(FLOW_NAMESPACE, f"{dataset_id}/flow/{key}"))
+
+
+def default_dataset_id(csv_file):
+    return os.path.splitext(os.path.basename(csv_file))[0]
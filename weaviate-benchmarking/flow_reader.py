@@ -0,0 +1,73 @@
+# flow_reader.py - streaming readers for tshark IP flow exports (CSV or Parquet)
+import os
+
+import pandas as pd
+
+# tshark CSV columns -> IPFlow properties
+CSV_COLUMNS = {
+    "frame.number": "frame_number",
+    "frame.time": "frame_time",
+    "ip.src": "source_ip",
+    "ip.dst": "destination_ip",
+    "tcp.srcport": "source_port",
+    "tcp.dstport": "destination_port",
+    "_ws.col.protocol": "protocol",
+    "frame.len": "frame_length",
+}
+INT_COLUMNS = ["frame_number", "source_port", "destination_port", "frame_length"]
+
+def read_ip_flow_chunks(csv_file, chunk_size, progress=None, skip_rows=0):
+    """
+    Single streaming pass over the CSV, yielding lists of up to chunk_size
+    parsed rows. Columns are typed per chunk (blank or non-numeric ints
+    become 0). If given, progress['rows_read'] counts the rows yielded and
+    progress['bytes_read'] approximates how far into the file they reach: the
+    parser reads ahead in 256 KB blocks, so it can be up to one block ahead
+    (exact at the end of the file). Use it for progress, not as a resume offset.
+    The first skip_rows data rows are dropped by the parser (used by --resume).
+    Parquet files written by `main.py generate` are read batch by batch.
+    """
+    if csv_file.endswith(".parquet"):
+        yield from read_ip_flow_parquet_chunks(csv_file, chunk_size, progress=progress, skip_rows=skip_rows)
+        return
+    with open(csv_file, mode="rb") as file:
+        reader = pd.read_csv(
+            file,
+            chunksize=chunk_size,
+            usecols=list(CSV_COLUMNS),
+            dtype=str,
+            keep_default_na=False,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None
+        )
+        for frame in reader:
+            if progress is not None:
+                progress['rows_read'] = progress.get('rows_read', 0) + len(frame)
+                progress['bytes_read'] = file.tell()
+            yield typed_ip_flow_records(frame)
+
+def read_ip_flow_parquet_chunks(parquet_file, chunk_size, progress=None, skip_rows=0):
+    import pyarrow.parquet as pq
+    
+    parquet = pq.ParquetFile(parquet_file)
+    file_size = os.path.getsize(parquet_file)
+    total_rows = parquet.metadata.num_rows
+    rows_seen = 0
+    for record_batch in parquet.iter_batches(batch_size=chunk_size, columns=list(CSV_COLUMNS)):
+        frame = record_batch.to_pandas()
+        rows_seen += len(frame)
+        if rows_seen <= skip_rows:
+            continue
+        if rows_seen - len(frame) < skip_rows:
+            frame = frame.iloc[skip_rows - (rows_seen - len(frame)):]
+        if progress is not None:
+            # Row groups are compressed, so bytes are estimated from rows read
+            progress['rows_read'] = progress.get('rows_read', 0) + len(frame)
+            progress['bytes_read'] = int(file_size * rows_seen / total_rows)
+        yield typed_ip_flow_records(frame)
+
+def typed_ip_flow_records(frame):
+    frame = frame.rename(columns=CSV_COLUMNS)
+    for column in INT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0).astype("int64")
+    frame["protocol"] = frame["protocol"].astype(str).str.strip().str.upper()
+    return frame[list(CSV_COLUMNS.values())].to_dict("records")
@@ -0,0 +1,57 @@
+# flow_text.py - flow-to-sentence serializers used before text embedding
+
+
+def build_flow_text(flow_data):
+    return (
+        f"Traffic from IP address {flow_data['source_ip']} to {flow_data['destination_ip']} "
+        f"using {flow_data['protocol']} protocol on ports {flow_data['source_port']} -> {flow_data['destination_port']}. "
+        f"Packet number {flow_data['frame_number']} was captured at {flow_data['frame_time']} and was {flow_data['frame_length']} bytes long."
+    )
+
+
+def build_flow_text_no_timestamp(flow_data):
+    return (
+        f"Traffic from IP address {flow_data['source_ip']} to {flow_data['destination_ip']} "
+        f"using {flow_data['protocol']} protocol on ports {flow_data['source_port']} -> {flow_data['destination_port']}. "
+        f"The packet was {flow_data['frame_length']} bytes long."
+    )
+
+
+def build_flow_text_compact(flow_data):
+    return (
+        f"{flow_data['protocol']} {flow_data['source_ip']}:{flow_data['source_port']} -> "
+        f"{flow_data['destination_ip']}:{flow_data['destination_port']} {flow_data['frame_length']} bytes"
+    )
+
+
+def build_flow_text_fields_only(flow_data):
+    return (
+        f"{flow_data['protocol']} {flow_data['source_ip']} {flow_data['destination_ip']} "
+        f"{flow_data['source_port']} {flow_data['destination_port']} {flow_data['frame_length']}"
+    )
+
+
+FLOW_TEXT_TEMPLATES = {
+    "full": build_flow_text,
+    "no-timestamp": build_flow_text_no_timestamp,
+    "compact": build_flow_text_compact,
+    "fields-only": build_flow_text_fields_only,
+}
+
+class _FieldRecorder(dict):
+    """Stands in for a flow row and records which keys a template reads"""
+
+    def __missing__(self, key):
+        self[key] = ""
+        return ""
+
+
+def template_fields(text_builder):
+    """Properties a text builder reads, found by rendering it once against a recorder"""
+    recorder = _FieldRecorder()
+    text_builder(recorder)
+    return set(recorder)
+
+
+# Properties each template reads, so callers can tell whether a change affects the text
+TEMPLATE_FIELDS = {name: template_fields(text_builder) for name, text_builder in FLOW_TEXT_TEMPLATES.items()}
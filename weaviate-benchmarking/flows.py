@@ -0,0 +1,77 @@
+# flows.py - collapse packet rows into 5-tuple flow records
+AGGREGATE_CLASS = "IPFlowAggregate"
+
+
+def flow_key(data_object):
+    return (
+        data_object["source_ip"],
+        data_object["destination_ip"],
+        data_object["source_port"],
+        data_object["destination_port"],
+        data_object["protocol"]
+    )
+
+
+def new_flow(data_object):
+    frame_length = data_object["frame_length"]
+    return {
+        "source_ip": data_object["source_ip"],
+        "destination_ip": data_object["destination_ip"],
+        "source_port": data_object["source_port"],
+        "destination_port": data_object["destination_port"],
+        "protocol": data_object["protocol"],
+        "first_frame_number": data_object["frame_number"],
+        "last_frame_number": data_object["frame_number"],
+        "first_time": data_object["frame_time"],
+        "last_time": data_object["frame_time"],
+        "packet_count": 1,
+        "total_bytes": frame_length,
+        "min_frame_length": frame_length,
+        "max_frame_length": frame_length,
+        "mean_frame_length": float(frame_length)
+    }
+
+
+def add_packet(flow, data_object):
+    """Fold one more packet into an existing flow record"""
+    frame_length = data_object["frame_length"]
+    if data_object["frame_number"] < flow["first_frame_number"]:
+        flow["first_frame_number"] = data_object["frame_number"]
+        flow["first_time"] = data_object["frame_time"]
+    if data_object["frame_number"] > flow["last_frame_number"]:
+        flow["last_frame_number"] = data_object["frame_number"]
+        flow["last_time"] = data_object["frame_time"]
+    flow["packet_count"] += 1
+    flow["total_bytes"] += frame_length
+    flow["min_frame_length"] = min(flow["min_frame_length"], frame_length)
+    flow["max_frame_length"] = max(flow["max_frame_length"], frame_length)
+    flow["mean_frame_length"] = flow["total_bytes"] / flow["packet_count"]
+
+
+def aggregate_flows(chunks, flows=None):
+    """
+    Aggregate parsed packet rows (an iterable of row lists, as produced by
+    read_ip_flow_chunks) into a dict of 5-tuple -> flow record.
+    Pass an existing dict as `flows` to keep folding into it.
+    """
+    if flows is None:
+        flows = {}
+    for chunk in chunks:
+        for data_object in chunk:
+            key = flow_key(data_object)
+            flow = flows.get(key)
+            if flow is None:
+                flows[key] = new_flow(data_object)
+            else:
+                add_packet(flow, data_object)
+    return flows
+
+
+def build_aggregated_flow_text(flow):
+    return (
+        f"Traffic from IP address {flow['source_ip']} to {flow['destination_ip']} "
+        f"using {flow['protocol']} protocol on ports {flow['source_port']} -> {flow['destination_port']}. "
+        f"The flow carried {flow['packet_count']} packets and {flow['total_bytes']} bytes between {flow['first_time']} and {flow['last_time']}, "
+        f"with packets from {flow['min_frame_length']} to {flow['max_frame_length']} bytes long "
+        f"(mean {flow['mean_frame_length']:.1f})."
+    )
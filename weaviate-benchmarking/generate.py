@@ -0,0 +1,172 @@
+# generate.py - synthetic tshark-style IP flow datasets for benchmarking
+import csv
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+CSV_HEADER = ["frame.number", "frame.time", "ip.src", "ip.dst", "tcp.srcport", "tcp.dstport", "_ws.col.protocol", "frame.len"]
+
+# (protocol column, share of packets, carried over TCP, server ports, frame length range)
+PROTOCOL_MIX = [
+    ("TCP",     0.38, True,  [443, 80, 22, 8080, 3306, 5432, 6379], (54, 1514)),
+    ("TLSv1.3", 0.20, True,  [443],                                 (90, 1514)),
+    ("HTTP",    0.07, True,  [80, 8080],                            (200, 1514)),
+    ("SSH",     0.03, True,  [22],                                  (66, 700)),
+    ("DNS",     0.12, False, [53],                                  (70, 320)),
+    ("QUIC",    0.10, False, [443],                                 (70, 1392)),
+    ("UDP",     0.06, False, [123, 161, 514],                       (60, 600)),
+    ("ICMP",    0.04, False, [],                                    (74, 98)),
+]
+
+# Share of TCP segments that are bare ACKs (smallest frame length)
+TCP_ACK_SHARE = 0.35
+
+
+def zipf_probabilities(count, exponent):
+    weights = 1.0 / np.arange(1, count + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def make_host_pool(rng, count, private_share=0.6):
+    """Random IPv4 addresses, a share of them inside RFC 1918 ranges"""
+    octets = rng.integers(1, 255, size=(count, 4))
+    private = rng.random(count) < private_share
+    kind = rng.integers(0, 3, size=count)
+    octets[private & (kind == 0), 0] = 10
+    octets[private & (kind == 1), 0] = 172
+    octets[private & (kind == 1), 1] = rng.integers(16, 32, size=int((private & (kind == 1)).sum()))
+    octets[private & (kind == 2), 0] = 192
+    octets[private & (kind == 2), 1] = 168
+    return np.array([".".join(map(str, row)) for row in octets.tolist()], dtype=object)
+
+
+def format_frame_times(timestamps_ns, tz_name):
+    """tshark frame.time strings, e.g. 'Feb  9, 2025 01:29:22.694218255 UTC'"""
+    seconds = timestamps_ns // 1_000_000_000
+    unique_seconds, inverse = np.unique(seconds, return_inverse=True)
+    # Timestamps are dense in time, so only the distinct seconds are formatted
+    prefixes = pd.to_datetime(unique_seconds, unit="s").strftime("%b %e, %Y %H:%M:%S").to_numpy(dtype=object)
+    fractions = np.char.zfill((timestamps_ns % 1_000_000_000).astype(str), 9).astype(object)
+    return prefixes[inverse] + "." + fractions + f" {tz_name}"
+
+
+def generate_chunk(rng, start_frame, count, start_ns, hosts, host_p, protocol_p,
+                   mean_burst_packets, intra_burst_gap_us, inter_burst_gap_ms, tz_name):
+    # Bursty arrivals: each packet starts a new burst with probability 1/mean_burst_packets
+    new_burst = rng.random(count) < 1.0 / mean_burst_packets
+    gaps_ns = np.where(
+        new_burst,
+        rng.exponential(inter_burst_gap_ms * 1e6, count),
+        rng.exponential(intra_burst_gap_us * 1e3, count)
+    ).astype(np.int64)
+    timestamps_ns = start_ns + np.cumsum(gaps_ns)
+
+    clients = rng.choice(len(hosts), size=count, p=host_p)
+    servers = rng.choice(len(hosts), size=count, p=host_p)
+    servers = np.where(servers == clients, (servers + 1) % len(hosts), servers)
+
+    protocol_index = rng.choice(len(PROTOCOL_MIX), size=count, p=protocol_p)
+    protocols = np.empty(count, dtype=object)
+    server_ports = np.zeros(count, dtype=np.int64)
+    frame_lengths = np.zeros(count, dtype=np.int64)
+    over_tcp = np.zeros(count, dtype=bool)
+    for index, (name, _, tcp, ports, (low, high)) in enumerate(PROTOCOL_MIX):
+        mask = protocol_index == index
+        selected = int(mask.sum())
+        if not selected:
+            continue
+        protocols[mask] = name
+        over_tcp[mask] = tcp
+        if ports:
+            server_ports[mask] = rng.choice(ports, size=selected)
+        lengths = rng.integers(low, high + 1, size=selected)
+        if tcp:
+            # Bulk transfers fill the MTU, acknowledgements are minimal
+            roll = rng.random(selected)
+            lengths = np.where(roll < TCP_ACK_SHARE, low, np.where(roll > 0.7, high, lengths))
+        frame_lengths[mask] = lengths
+    client_ports = rng.integers(32768, 61000, size=count)
+
+    # Roughly half the packets travel server -> client
+    reply = rng.random(count) < 0.5
+    source_ip = np.where(reply, hosts[servers], hosts[clients])
+    destination_ip = np.where(reply, hosts[clients], hosts[servers])
+    source_port = np.where(reply, server_ports, client_ports)
+    destination_port = np.where(reply, client_ports, server_ports)
+
+    # tshark leaves tcp.* empty for packets that are not TCP
+    source_port = np.where(over_tcp, source_port.astype(str), "")
+    destination_port = np.where(over_tcp, destination_port.astype(str), "")
+
+    frame = pd.DataFrame({
+        "frame.number": np.arange(start_frame, start_frame + count),
+        "frame.time": format_frame_times(timestamps_ns, tz_name),
+        "ip.src": source_ip,
+        "ip.dst": destination_ip,
+        "tcp.srcport": source_port,
+        "tcp.dstport": destination_port,
+        "_ws.col.protocol": protocols,
+        "frame.len": frame_lengths,
+    }, columns=CSV_HEADER)
+    return frame, int(timestamps_ns[-1])
+
+
+def generate_ip_flows(output_file, rows, seed=42, num_hosts=5000, zipf_exponent=1.1, chunk_size=1_000_000,
+                      mean_burst_packets=20, intra_burst_gap_us=50.0, inter_burst_gap_ms=20.0,
+                      start_time="2025-02-09 01:29:22", tz_name="UTC", output_format=None):
+    """
+    Stream `rows` synthetic packets to CSV or Parquet in the column layout of
+    tshark exports (the layout insert_ip_flows reads). Host popularity is Zipfian,
+    protocols and ports follow PROTOCOL_MIX and arrivals come in bursts.
+    The same seed always produces the same file.
+    """
+    if rows <= 0 or chunk_size <= 0:
+        raise ValueError(f"rows and chunk_size must be positive, got {rows} and {chunk_size}")
+    if output_format is None:
+        output_format = "parquet" if output_file.endswith(".parquet") else "csv"
+    rng = np.random.default_rng(seed)
+    hosts = make_host_pool(rng, num_hosts)
+    host_p = zipf_probabilities(num_hosts, zipf_exponent)
+    protocol_p = np.array([share for _, share, _, _, _ in PROTOCOL_MIX])
+    protocol_p = protocol_p / protocol_p.sum()
+    next_ns = pd.Timestamp(start_time).value
+
+    writer = None
+    if output_format == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+    print(f"Generating {rows} rows -> {output_file} ({output_format}, seed {seed}, {num_hosts} hosts)")
+    start = time.time()
+    written = 0
+    try:
+        while written < rows:
+            count = min(chunk_size, rows - written)
+            frame, next_ns = generate_chunk(
+                rng, written + 1, count, next_ns, hosts, host_p, protocol_p,
+                mean_burst_packets, intra_burst_gap_us, inter_burst_gap_ms, tz_name
+            )
+            if output_format == "parquet":
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_file, table.schema)
+                writer.write_table(table)
+            else:
+                frame.to_csv(output_file, mode="w" if written == 0 else "a", header=written == 0,
+                             index=False, quoting=csv.QUOTE_ALL)
+            written += count
+            elapsed = time.time() - start
+            print(f"Progress: {written}/{rows} ({written / rows * 100:.1f}%) - {written / elapsed:.0f} rows/sec")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    duration = time.time() - start
+    size_mb = os.path.getsize(output_file) / (1024 * 1024)
+    print(f"Generated {written} rows ({size_mb:.1f} MB) in {duration:.2f} seconds")
+    return duration
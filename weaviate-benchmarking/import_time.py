@@ -0,0 +1,58 @@
+# import_time.py - `python -X importtime` report guarding CLI startup cost
+import subprocess
+import sys
+
+# Packages that must only be imported by the command that uses them
+HEAVY_PACKAGES = ["torch", "sentence_transformers", "transformers", "pandas", "pyarrow", "weaviate", "matplotlib"]
+DEFAULT_MODULES = ["main", "ingest", "query", "benchmark"]
+
+
+def measure_import(module, cwd=None):
+    """
+    Import `module` in a fresh interpreter under -X importtime. Returns the
+    module's cumulative import time in ms and {package: cumulative ms} for
+    every top-level package it pulled in.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=cwd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr}")
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((name, int(cumulative)))
+
+    # Nested imports are printed (indented) before the module that triggered them,
+    # so the target's own imports are the indented run just above its line
+    end = max(index for index, (name, _) in enumerate(entries) if name.strip() == module)
+    start = end
+    while start > 0 and entries[start - 1][0].startswith("  "):
+        start -= 1
+    packages = {}
+    for name, cumulative in entries[start:end]:
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative / 1000)
+    return entries[end][1] / 1000, packages
+
+
+def check_import_time(modules=None, budget_ms=None, heavy_packages=None, cwd=None, top=5):
+    """Report each module's import cost; False if one imports a heavy package or exceeds budget_ms"""
+    modules = modules or DEFAULT_MODULES
+    heavy_packages = HEAVY_PACKAGES if heavy_packages is None else heavy_packages
+    passed = True
+    for module in modules:
+        total_ms, packages = measure_import(module, cwd=cwd)
+        heavy = [package for package in heavy_packages if package in packages]
+        over_budget = budget_ms is not None and total_ms > budget_ms
+        status = "FAIL" if heavy or over_budget else "ok"
+        print(f"{status:<4} import {module:<12} {total_ms:8.1f} ms")
+        slowest = sorted(((ms, package) for package, ms in packages.items() if package != module), reverse=True)[:top]
+        print("       slowest: " + ", ".join(f"{package} {ms:.1f} ms" for ms, package in slowest))
+        if heavy:
+            print(f"       heavy packages imported eagerly: {', '.join(heavy)}")
+        if over_budget:
+            print(f"       over the {budget_ms} ms budget")
+        passed = passed and not (heavy or over_budget)
+    return passed
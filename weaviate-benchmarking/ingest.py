@@ -1,9 +1,17 @@
-import csv
-import weaviate
+import contextlib
+import json
+import os
 import time
-from sentence_transformers import SentenceTransformer
 import psutil
 import threading
+from pipeline import run_pipeline, print_stage_stats
+from embed_workers import EmbeddingPool, SharedVectors
+from embedding_cache import EmbeddingCache
+from flows import AGGREGATE_CLASS, aggregate_flows, build_aggregated_flow_text
+from flow_ids import ip_flow_uuid, aggregate_flow_uuid, default_dataset_id
+from resources import get_client
+import resources
+from flow_text import FLOW_TEXT_TEMPLATES, build_flow_text
 
 cpu_usage_log = []
 weaviate_memory_log = []
@@ -117,28 +125,98 @@ def save_process_logs():
     print(f"  - Python memory (SECONDARY): ingest_python_memory_log.txt")
 
 
-client = weaviate.Client("http://localhost:8080")
-embed_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+def create_ip_flow_embedding(flow_data, embed_model=None):
+    return (embed_model or resources.configured_embed_model()).encode(build_flow_text(flow_data)).tolist()
 
-def create_ip_flow_embedding(flow_data):
-    flow_text = (
-        f"Traffic from IP address {flow_data['source_ip']} to {flow_data['destination_ip']} "
-        f"using {flow_data['protocol']} protocol on ports {flow_data['source_port']} -> {flow_data['destination_port']}. "
-        f"Packet number {flow_data['frame_number']} was captured at {flow_data['frame_time']} and was {flow_data['frame_length']} bytes long."
-    )
-    return embed_model.encode(flow_text).tolist()
+def create_ip_flow_embeddings(flow_data_list, batch_size=64, text_builder=build_flow_text, embed_model=None):
+    """Embed a chunk of flows with a single encode() call instead of one call per row"""
+    flow_texts = [text_builder(flow_data) for flow_data in flow_data_list]
+    vectors = (embed_model or resources.configured_embed_model()).encode(flow_texts, batch_size=batch_size)
+    return [vector.tolist() for vector in vectors]
 
-def safe_int(value):
-    try:
-        return int(value)
-    except (ValueError, TypeError):
-        return 0
+def load_checkpoint(checkpoint_file):
+    if not os.path.exists(checkpoint_file):
+        return None
+    with open(checkpoint_file) as f:
+        return json.load(f)
+
+def save_checkpoint(checkpoint_file, dataset_id, class_name, rows_committed, byte_offset, complete=False):
+    """
+    Record how many rows are known to be stored; written atomically. Resuming
+    uses rows_committed only: byte_offset is the reader's approximate position,
+    which runs ahead of the committed rows (read-ahead blocks, pipeline queues).
+    """
+    tmp_path = checkpoint_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "dataset_id": dataset_id,
+            "class_name": class_name,
+            "rows_committed": rows_committed,
+            "byte_offset": byte_offset,
+            "complete": complete,
+            "updated_at": time.time()
+        }, f)
+    os.replace(tmp_path, checkpoint_file)
+
+def record_batch_errors(results, failed_rows):
+    """Collect per-object errors reported by /v1/batch/objects"""
+    for result in results or []:
+        errors = result.get("result", {}).get("errors")
+        if not errors:
+            continue
+        properties = result.get("properties", {})
+        frame_number = properties.get("frame_number", properties.get("first_frame_number"))
+        for error in errors.get("error", []):
+            failed_rows.append((frame_number, error.get("message")))
+
+def upload_ip_flows(data_objects, vectors, batch=None, failed_rows=None, class_name="IPFlow", uuids=None, client=None):
+    """Send a chunk of flows either one request per object or through client.batch"""
+    # The client package is only imported once something is actually sent
+    from weaviate.exceptions import ObjectAlreadyExistsException
+
+    if uuids is None:
+        uuids = [None] * len(data_objects)
+    for data_object, vector, object_uuid in zip(data_objects, vectors, uuids):
+        if hasattr(vector, "tolist"):
+            # numpy rows (e.g. views into shared memory) are copied out here
+            vector = vector.tolist()
+        if batch is not None:
+            batch.add_data_object(data_object, class_name, uuid=object_uuid, vector=vector)
+            continue
+        try:
+            try:
+                (client or get_client()).data_object.create(data_object, class_name, uuid=object_uuid, vector=vector)
+            except ObjectAlreadyExistsException:
+                # Rows re-sent after --resume already exist under their deterministic id
+                if object_uuid is None:
+                    raise
+                (client or get_client()).data_object.replace(data_object, class_name, uuid=object_uuid, vector=vector)
+        except Exception as e:
+            if failed_rows is None:
+                raise
+            failed_rows.append((data_object.get("frame_number", data_object.get("first_frame_number")), str(e)))
 
-def insert_ip_flows(csv_file):
+def insert_ip_flows(csv_file, chunk_size=256, embed_batch_size=64, import_mode="single",
+                    import_batch_size=100, dynamic_batching=True, num_workers=1,
+                    pipelined=False, queue_size=4, embed_workers=0, cache_dir=None, cache_max_mb=512,
+                    aggregate=False, dataset_id=None, resume=False, checkpoint_file=None,
+                    checkpoint_every=10000, vector_mode="text", field_cache_size=100000, flow_template="full",
+                    embed_model=None, client=None):
     global cpu_usage_log, weaviate_memory_log, python_memory_log
+    # pandas-backed helpers are only needed once an ingest actually runs
+    from flow_reader import read_ip_flow_chunks
+    from features import FEATURE_CLASS, flow_feature_vectors
+    from compositional import CompositionalEmbedder
     
+    # Callers such as the dashboard pass their shared instances; the CLI uses the ones configured in resources
+    client = client or get_client()
+    if embed_model is None and (vector_mode == "compositional" or (vector_mode == "text" and embed_workers == 0)):
+        embed_model = resources.configured_embed_model()
     print("=== STARTING IP FLOW INGESTION WITH COMPREHENSIVE MONITORING ===")
     
+    if vector_mode == "features" and aggregate:
+        raise ValueError("Feature vectors are built from packet rows and cannot be combined with flow aggregation")
+    
     # Reset logs
     cpu_usage_log = []
     weaviate_memory_log = []
@@ -160,47 +238,196 @@ def insert_ip_flows(csv_file):
     monitor_thread = threading.Thread(target=log_process_metrics, daemon=True)
     monitor_thread.start()
     
-    # Count total rows for progress tracking
-    total_rows = 0
-    with open(csv_file, mode="r") as file:
-        total_rows = sum(1 for line in file) - 1  # Subtract header row
+    # Progress is measured against the file size, so the file is only read once
+    file_size = os.path.getsize(csv_file)
+    read_progress = {'rows_read': 0, 'bytes_read': 0}
+    print(f"File size: {file_size / (1024 * 1024):.2f} MB")
+    
+    # Object UUIDs derive from dataset id + key, so re-runs overwrite rather than duplicate
+    if dataset_id is None:
+        dataset_id = default_dataset_id(csv_file)
+    if aggregate:
+        class_name = AGGREGATE_CLASS
+    else:
+        class_name = FEATURE_CLASS if vector_mode == "features" else "IPFlow"
+    # One checkpoint per target class: a text and a features run over the same CSV commit different objects
+    if checkpoint_file is None:
+        checkpoint_file = f"{csv_file}.{class_name}.checkpoint.json"
+    print(f"Dataset id: {dataset_id} (checkpoint: {checkpoint_file})")
     
-    print(f"Total rows to process: {total_rows}")
+    skip_rows = 0
+    if resume:
+        checkpoint = load_checkpoint(checkpoint_file)
+        if checkpoint is None:
+            print("No checkpoint found, starting from the beginning")
+        elif checkpoint["dataset_id"] != dataset_id:
+            raise ValueError(f"Checkpoint {checkpoint_file} belongs to dataset '{checkpoint['dataset_id']}', not '{dataset_id}'")
+        elif checkpoint["class_name"] != class_name:
+            raise ValueError(f"Checkpoint {checkpoint_file} was written for class '{checkpoint['class_name']}', not '{class_name}'")
+        else:
+            skip_rows = checkpoint["rows_committed"]
+            print(f"Resuming after {skip_rows} committed rows (reader was at ~{checkpoint['byte_offset']} bytes)")
     
     # Process the CSV file
     processed_rows = 0
     start_time = time.time()
     
-    with open(csv_file, mode="r") as file:
-        reader = csv.DictReader(file)
-        
-        for row in reader:
-            processed_rows += 1
-            
-            # Create data object
-            data_object = {
-                "frame_number": safe_int(row["frame.number"]),
-                "frame_time": row["frame.time"],
-                "source_ip": row["ip.src"],
-                "destination_ip": row["ip.dst"],
-                "source_port": safe_int(row["tcp.srcport"]),
-                "destination_port": safe_int(row["tcp.dstport"]),
-                "protocol": row["_ws.col.protocol"].strip().upper(),
-                "frame_length": safe_int(row["frame.len"])
-            }
-            
-            # Create vector embedding
-            vector_embedding = create_ip_flow_embedding(data_object)
-            
+    if aggregate:
+        # Collapse packets into 5-tuple flows; only the flows are embedded and stored
+        packet_count = 0
+        flows = {}
+        for chunk in read_ip_flow_chunks(csv_file, chunk_size, progress=read_progress):
+            aggregate_flows([chunk], flows)
+            if (packet_count + len(chunk)) // 100000 > packet_count // 100000:
+                print(f"Aggregating: {packet_count + len(chunk)} packets, ~{read_progress['bytes_read'] / (1024 * 1024):.1f}/"
+                      f"{file_size / (1024 * 1024):.1f} MB read, {len(flows)} flows")
+            packet_count += len(chunk)
+        aggregated_flows = list(flows.values())
+        print(f"Aggregated {packet_count} packets into {len(aggregated_flows)} flows ({time.time() - start_time:.2f}s)")
+        aggregated_flows = aggregated_flows[skip_rows:]
+        total_flows = len(aggregated_flows)
+        text_builder = build_aggregated_flow_text
+        object_uuid = lambda flow: aggregate_flow_uuid(dataset_id, flow)
+        chunk_source = (aggregated_flows[i:i + chunk_size] for i in range(0, len(aggregated_flows), chunk_size))
+    else:
+        text_builder = FLOW_TEXT_TEMPLATES[flow_template]
+        object_uuid = lambda data_object: ip_flow_uuid(dataset_id, data_object["frame_number"])
+        chunk_source = read_ip_flow_chunks(csv_file, chunk_size, progress=read_progress, skip_rows=skip_rows)
+    
+    print(f"Embedding in chunks of {chunk_size} rows (encode batch size {embed_batch_size}, template '{flow_template}')")
+    
+    # Per-object failures as (frame_number, message), from either import mode
+    failed_rows = []
+    if import_mode == "batch":
+        print(f"Batch import: batch size {import_batch_size}, dynamic={dynamic_batching}, workers={num_workers}")
+        client.batch.configure(
+            batch_size=import_batch_size,
+            dynamic=dynamic_batching,
+            num_workers=num_workers,
+            callback=lambda results: record_batch_errors(results, failed_rows)
+        )
+        batch_context = client.batch
+    else:
+        batch_context = contextlib.nullcontext()
+    
+    # Optional pool of embedding processes, each with its own model copy
+    embed_pool = None
+    if embed_workers > 0 and vector_mode == "text":
+        print(f"Starting {embed_workers} embedding worker processes...")
+        embed_pool = EmbeddingPool(resources.embedder_options, embed_workers)
+    
+    # Optional on-disk cache so repeat ingests of the same capture skip inference
+    embed_cache = None
+    if cache_dir and vector_mode == "text":
+        if embed_pool is not None:
+            embedder_name, dimension = embed_pool.name, embed_pool.dimension
+        else:
+            embedder_name, dimension = embed_model.name, embed_model.get_sentence_embedding_dimension()
+        embed_cache = EmbeddingCache(cache_dir, embedder_name, dimension, max_mb=cache_max_mb)
+        print(f"Embedding cache: {embed_cache.directory} ({len(embed_cache)}/{embed_cache.max_entries} entries)")
+    
+    def encode_missing(flow_texts):
+        shared = embed_pool.encode(flow_texts, batch_size=embed_batch_size)
+        try:
+            return shared.array.copy()
+        finally:
+            shared.release()
+    
+    # Per-field-value embeddings composed into row vectors
+    compositional = None
+    if vector_mode == "compositional":
+        compositional = CompositionalEmbedder(embed_model, max_entries=field_cache_size)
+        print(f"Compositional embedding over {compositional.base_embedder.name} (field cache {field_cache_size} values)")
+    
+    def encode_texts(flow_texts):
+        return embed_model.encode(flow_texts, batch_size=embed_batch_size)
+    
+    def embed_chunk(chunk):
+        if compositional is not None:
+            return chunk, compositional.encode_flows(chunk, batch_size=embed_batch_size)
+        if vector_mode == "features":
+            # Numeric vectors straight from the parsed columns, no model involved
+            return chunk, flow_feature_vectors(chunk)
+        if embed_cache is not None:
+            flow_texts = [text_builder(flow_data) for flow_data in chunk]
+            if embed_pool is not None:
+                return chunk, embed_cache.encode(flow_texts, encode_missing)
+            return chunk, embed_cache.encode(flow_texts, encode_texts)
+        if embed_pool is not None:
+            # Chunk is split across the workers; vectors come back in shared memory
+            return chunk, embed_pool.encode([text_builder(flow_data) for flow_data in chunk], batch_size=embed_batch_size)
+        # One encode() call for the whole chunk
+        return chunk, create_ip_flow_embeddings(chunk, batch_size=embed_batch_size, text_builder=text_builder,
+                                                embed_model=embed_model)
+    
+    def report_progress():
+        elapsed_time = time.time() - start_time
+        rows_per_second = processed_rows / elapsed_time if elapsed_time > 0 else 0
+        if aggregate:
+            progress_percent = (processed_rows / total_flows) * 100 if total_flows else 100.0
+            print(f"Progress: {processed_rows}/{total_flows} flows ({progress_percent:.1f}%) - {rows_per_second:.1f} rows/sec")
+        else:
+            bytes_read = read_progress['bytes_read']
+            progress_percent = (bytes_read / file_size) * 100 if file_size else 100.0
+            # The reader's offset runs up to one read-ahead block past the rows it has parsed
+            print(f"Progress: {processed_rows} rows, ~{bytes_read / (1024 * 1024):.1f}/{file_size / (1024 * 1024):.1f} MB read "
+                  f"(~{progress_percent:.1f}%) - {rows_per_second:.1f} rows/sec")
+    
+    last_checkpoint_rows = 0
+    
+    with batch_context as batch:
+        def upload_chunk(embedded_chunk):
+            nonlocal processed_rows, last_checkpoint_rows
+            chunk, vector_embeddings = embedded_chunk
+            uuids = [object_uuid(data_object) for data_object in chunk]
             # Insert into Weaviate
-            client.data_object.create(data_object, "IPFlow", vector=vector_embedding)
+            if isinstance(vector_embeddings, SharedVectors):
+                try:
+                    upload_ip_flows(chunk, vector_embeddings.array, batch=batch, failed_rows=failed_rows,
+                                    class_name=class_name, uuids=uuids, client=client)
+                finally:
+                    vector_embeddings.release()
+            else:
+                upload_ip_flows(chunk, vector_embeddings, batch=batch, failed_rows=failed_rows,
+                                class_name=class_name, uuids=uuids, client=client)
+            processed_rows += len(chunk)
+            report_progress()
             
-            # Progress reporting every 100 rows
-            if processed_rows % 100 == 0:
-                elapsed_time = time.time() - start_time
-                progress_percent = (processed_rows / total_rows) * 100
-                rows_per_second = processed_rows / elapsed_time if elapsed_time > 0 else 0
-                print(f"Progress: {processed_rows}/{total_rows} ({progress_percent:.1f}%) - {rows_per_second:.1f} rows/sec")
+            if processed_rows - last_checkpoint_rows >= checkpoint_every:
+                # Buffered batch objects must reach Weaviate before they count as committed
+                if batch is not None:
+                    batch.flush()
+                # The checkpoint only covers a prefix of stored rows, so it stops before the first failure
+                if not failed_rows:
+                    save_checkpoint(checkpoint_file, dataset_id, class_name, skip_rows + processed_rows, read_progress['bytes_read'])
+                last_checkpoint_rows = processed_rows
+        
+        try:
+            if pipelined:
+                # Reading, embedding and uploading overlap; bounded queues give backpressure
+                print(f"Pipelined ingest: queue size {queue_size} chunks per stage")
+                pipeline_wall, stage_stats = run_pipeline(
+                    chunk_source,
+                    embed_chunk,
+                    upload_chunk,
+                    queue_size=queue_size
+                )
+            else:
+                for chunk in chunk_source:
+                    upload_chunk(embed_chunk(chunk))
+        finally:
+            if embed_pool is not None:
+                embed_pool.close()
+            if embed_cache is not None:
+                embed_cache.save()
+    
+    # Leaving the batch context flushed everything, so without failures the whole input is committed
+    if not failed_rows:
+        save_checkpoint(checkpoint_file, dataset_id, class_name, skip_rows + processed_rows, read_progress['bytes_read'], complete=True)
+    else:
+        checkpoint = load_checkpoint(checkpoint_file)
+        committed = checkpoint["rows_committed"] if checkpoint and checkpoint["dataset_id"] == dataset_id else 0
+        print(f"Checkpoint left at {committed} rows because of failed rows; --resume re-sends everything after it")
     
     # Calculate total duration
     duration = time.time() - start_time
@@ -216,7 +443,25 @@ def insert_ip_flows(csv_file):
     print(f"Total Ingestion Time: {duration:.4f} seconds")
     print(f"Total Rows Processed: {processed_rows}")
     print(f"Average Rows/Second: {processed_rows/duration:.2f}")
-    print("IP Flows ingested successfully with vector embeddings!")
+    if pipelined:
+        print_stage_stats(pipeline_wall, stage_stats)
+    if compositional is not None:
+        field_stats = compositional.stats()
+        print(f"Field Value Cache: {field_stats['entries']} values, {field_stats['hits']} hits, {field_stats['misses']} encoded "
+              f"({field_stats['hit_rate_percent']:.1f}% hit rate), {field_stats['evictions']} evictions")
+    if embed_cache is not None:
+        cache_stats = embed_cache.stats()
+        print(f"Embedding Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate_percent']:.1f}% hit rate), {cache_stats['evictions']} evictions, "
+              f"{cache_stats['entries']}/{cache_stats['max_entries']} entries")
+    if failed_rows:
+        print(f"Failed Rows: {len(failed_rows)}")
+        for frame_number, message in failed_rows[:10]:
+            print(f"  frame {frame_number}: {message}")
+        if len(failed_rows) > 10:
+            print(f"  ... {len(failed_rows) - 10} more")
+    else:
+        print("IP Flows ingested successfully with vector embeddings!")
     
     # Print Weaviate stats (PRIMARY)
     if initial_weaviate and final_weaviate:
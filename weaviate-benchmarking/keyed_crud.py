@@ -0,0 +1,84 @@
+# keyed_crud.py - update and delete objects addressed by id, without lookup queries
+#
+# Ingested flows have deterministic UUIDs (flow_ids.py), so a caller holding a
+# dataset id and frame numbers already knows every object id. Deletes go out
+# as batch delete-by-filter on those ids. Updates fetch each chunk of ids in one
+# filtered query and write it back as one batch upsert keyed by the same ids
+# (bulk_update.update_id_pages): the upsert replaces each object with the
+# fetched snapshot plus the patch, keeping the stored vector, so a write that
+# lands on one of those objects between the fetch and the upsert is lost.
+# write="patch" closes that window at one PATCH request per object.
+from bulk_delete import delete_where
+from bulk_update import update_id_pages
+
+
+MAX_KEYS = 100000
+
+
+def parse_key_ranges(specs, max_keys=MAX_KEYS):
+    """
+    Key specs such as '17', '100-200' or '5,9,12-14' (ranges inclusive) ->
+    sorted unique ints. Raises ValueError when they add up to more than
+    max_keys keys (None for no limit), before any list of that size is built.
+    """
+    keys = set()
+    requested = 0
+    for spec in specs:
+        for part in str(spec).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                first, last = (int(value) for value in part.split("-", 1))
+                if last < first:
+                    raise ValueError(f"Empty key range '{part}'")
+                requested += last - first + 1
+            else:
+                first = last = int(part)
+                requested += 1
+            if max_keys is not None and requested > max_keys:
+                raise ValueError(f"Key specs cover more than {max_keys} keys; raise the limit to allow this")
+            keys.update(range(first, last + 1))
+    return sorted(keys)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def delete_by_ids(client, class_name, ids, chunk_size=10000, dry_run=False, output="minimal"):
+    """Batch-delete the given ids, chunk_size ids per filter; ids that do not exist are simply not matched"""
+    totals = {'requests': 0, 'matched': 0, 'deleted': 0, 'failed': 0, 'failed_objects': [], 'seconds': 0.0}
+    for chunk in _chunks(list(ids), chunk_size):
+        stats = delete_where(client, class_name, {"path": ["id"], "operator": "ContainsAny", "valueTextArray": chunk},
+                             dry_run=dry_run, output=output)
+        for key in totals:
+            totals[key] += stats[key]
+    totals['missing'] = len(ids) - (totals['matched'] if dry_run else totals['deleted'] + totals['failed'])
+    print(f"{len(ids)} ids: {totals['matched']} matched, {totals['deleted']} deleted, "
+          f"{totals['missing']} not found, {totals['failed']} failed")
+    return totals
+
+
+def patch_by_ids(client, class_name, ids, patch, batch_size=500, num_workers=4, max_in_flight=None, mode="threads",
+                 session=None, write="batch", verbose=True):
+    """
+    Apply `patch` to each id, batch_size ids per fetch and batch upsert (see
+    the module header), over `session` (default: a WeaviateSession to the
+    client's server, closed on return) with num_workers workers and at most
+    max_in_flight batches outstanding. The stored vector is written back
+    unchanged. Ids that do not exist count as missing.
+    """
+    ids = list(ids)
+    stats = update_id_pages(client, class_name, _chunks(ids, batch_size), None, patch, num_workers=num_workers,
+                            max_in_flight=max_in_flight, mode=mode, session=session, write=write,
+                            only_changed=False, verbose=verbose)
+    stats['missing'] = len(ids) - stats['matched']
+    rate = stats['updated'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"Updated {stats['updated']} of {len(ids)} {class_name} objects ({len(stats['batches'])} batches, "
+          f"{num_workers} workers, {mode}, {write}) in {stats['seconds']:.2f}s ({rate:.0f} objects/sec), "
+          f"{stats['missing']} missing, {stats['failed']} failed, {stats['failed_batches']} batches errored")
+    for object_id, message in stats['errors'][:10]:
+        print(f"  failed {object_id}: {message}")
+    return stats
@@ -1,8 +1,11 @@
 # Updated main.py with Weaviate-focused reporting
+# Command modules are imported inside their branch so that a command only pays
+# for the dependencies it uses (see `main.py import-time`)
 import argparse
-from ingest import insert_ip_flows
-from query import semantic_query_ip_flow, update_ip_flow, delete_ip_flow
-from benchmark import benchmark_query, benchmark_crud_operation
+import functools
+from embedders import EMBEDDER_BACKENDS, EMBED_MODELS, DEFAULT_MODEL, DEFAULT_HASH_DIMENSION
+from flow_text import FLOW_TEXT_TEMPLATES
+from embed_server import DEFAULT_SOCKET_PATH
 import warnings
 
 def main():
@@ -10,39 +13,233 @@ def main():
     
     parser = argparse.ArgumentParser(description="IP Flow Analysis CLI")
     subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    # Embedder options shared by every command that embeds text
+    embedder_parser = argparse.ArgumentParser(add_help=False)
+    embedder_parser.add_argument("--embedder", choices=EMBEDDER_BACKENDS, default="sentence-transformers", help="Embedding backend")
+    embedder_parser.add_argument("--embed-model", default=DEFAULT_MODEL, help="Model for the sentence-transformers backend")
+    embedder_parser.add_argument("--embed-dim", type=int, default=DEFAULT_HASH_DIMENSION, help="Vector size for the hash backend")
+    embedder_parser.add_argument("--embed-server", default=DEFAULT_SOCKET_PATH, metavar="SOCKET",
+                                 help="Use the embedding daemon on this socket when it is running")
+    embedder_parser.add_argument("--no-embed-server", action="store_true", help="Always load the model in this process")
+
+    # Concurrency options shared by the bulk update / delete commands (see parallel.py)
+    concurrency_parser = argparse.ArgumentParser(add_help=False)
+    concurrency_parser.add_argument("--max-in-flight", type=int, help="Requests submitted but unfinished (default: 2 x workers)")
+    concurrency_parser.add_argument("--async", dest="mode", action="store_const", const="asyncio", default="threads",
+                                    help="Drive the requests from an asyncio loop instead of a thread pool")
 
     # Subparser for ingesting IP flows
-    ingest_parser = subparsers.add_parser("ingest")
+    ingest_parser = subparsers.add_parser("ingest", parents=[embedder_parser])
     ingest_parser.add_argument("csv_file")
+    ingest_parser.add_argument("--chunk-size", type=int, default=256, help="Rows gathered before each encode() call")
+    ingest_parser.add_argument("--embed-batch-size", type=int, default=64, help="Batch size passed to encode()")
+    ingest_parser.add_argument("--import-mode", choices=["single", "batch"], default="single", help="One create request per row, or the batch import API")
+    ingest_parser.add_argument("--import-batch-size", type=int, default=100, help="Objects per /v1/batch/objects request")
+    ingest_parser.add_argument("--no-dynamic-batching", action="store_true", help="Keep the import batch size fixed")
+    ingest_parser.add_argument("--import-workers", type=int, default=1, help="Concurrent batch import workers")
+    ingest_parser.add_argument("--pipelined", action="store_true", help="Overlap CSV reading, embedding and upload")
+    ingest_parser.add_argument("--queue-size", type=int, default=4, help="Chunks buffered between pipeline stages")
+    ingest_parser.add_argument("--embed-workers", type=int, default=0, help="Embedding worker processes (0 embeds in this process)")
+    ingest_parser.add_argument("--embed-cache", metavar="DIR", help="Directory of the persistent embedding cache")
+    ingest_parser.add_argument("--embed-cache-mb", type=int, default=512, help="Size cap of the embedding cache's vector file")
+    ingest_parser.add_argument("--aggregate", action="store_true", help="Store one IPFlowAggregate object per 5-tuple flow instead of per packet")
+    ingest_parser.add_argument("--vector-mode", choices=["text", "features", "compositional"], default="text",
+                               help="Embed the flow sentence, build numeric feature vectors into IPFlowFeatures, "
+                                    "or compose row vectors from cached field-value embeddings")
+    ingest_parser.add_argument("--field-cache-size", type=int, default=100000, help="Field values kept by the compositional mode")
+    ingest_parser.add_argument("--flow-template", choices=list(FLOW_TEXT_TEMPLATES), default="full", help="Flow-to-text serializer")
+    ingest_parser.add_argument("--dataset-id", help="Namespace for deterministic object UUIDs (default: CSV file name)")
+    ingest_parser.add_argument("--resume", action="store_true", help="Skip rows already committed according to the checkpoint")
+    ingest_parser.add_argument("--checkpoint-file", help="Checkpoint path (default: next to the CSV file)")
+    ingest_parser.add_argument("--checkpoint-every", type=int, default=10000, help="Rows between checkpoints")
 
     # Subparser for semantic querying
-    query_parser = subparsers.add_parser("query")
+    query_parser = subparsers.add_parser("query", parents=[embedder_parser])
     query_parser.add_argument("query_text")
+    query_parser.add_argument("--aggregated", action="store_true", help="Query IPFlowAggregate flows instead of packets")
+
+    # Subparser for feature-vector queries against IPFlowFeatures
+    feature_query_parser = subparsers.add_parser("feature-query", help="Nearest flows by structured fields")
+    feature_query_parser.add_argument("--source-ip")
+    feature_query_parser.add_argument("--destination-ip")
+    feature_query_parser.add_argument("--source-port", type=int)
+    feature_query_parser.add_argument("--destination-port", type=int)
+    feature_query_parser.add_argument("--protocol")
+    feature_query_parser.add_argument("--frame-length", type=int)
+    feature_query_parser.add_argument("--time-of-day", help="HH:MM:SS")
+    feature_query_parser.add_argument("--limit", type=int, default=5)
 
     # Subparser for benchmarking
-    bench_parser = subparsers.add_parser("benchmark")
+    bench_parser = subparsers.add_parser("benchmark", parents=[embedder_parser])
     bench_parser.add_argument("queries", nargs="+")
     
-    update_parser = subparsers.add_parser("update")
+    generate_parser = subparsers.add_parser("generate", help="Write a synthetic IP flow dataset")
+    generate_parser.add_argument("output_file", help="Destination .csv or .parquet file")
+    generate_parser.add_argument("--rows", type=int, default=10000, help="Number of packets to generate")
+    generate_parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    generate_parser.add_argument("--hosts", type=int, default=5000, help="Size of the IP address pool")
+    generate_parser.add_argument("--zipf-exponent", type=float, default=1.1, help="Skew of IP popularity")
+    generate_parser.add_argument("--mean-burst-packets", type=float, default=20, help="Average packets per traffic burst")
+    generate_parser.add_argument("--chunk-size", type=int, default=1000000, help="Rows generated per write")
+    generate_parser.add_argument("--format", choices=["csv", "parquet"], help="Output format (default: from file extension)")
+    
+    templates_parser = subparsers.add_parser("bench-templates", parents=[embedder_parser],
+                                             help="Compare flow-text templates by tokens, speed and retrieval quality")
+    templates_parser.add_argument("csv_file")
+    templates_parser.add_argument("--rows", type=int, default=2000, help="Sample rows to embed")
+    templates_parser.add_argument("--batch-size", type=int, default=64)
+    templates_parser.add_argument("--k", type=int, default=10, help="Cut-off for precision@k")
+    templates_parser.add_argument("--templates", nargs="+", choices=list(FLOW_TEXT_TEMPLATES), help="Subset of templates")
+    templates_parser.add_argument("--output", help="Write results as JSON")
+    
+    quant_parser = subparsers.add_parser("bench-quant", help="Compare float32 and int8 CPU inference of an embedding model")
+    quant_parser.add_argument("csv_file")
+    quant_parser.add_argument("--embed-model", default=DEFAULT_MODEL)
+    quant_parser.add_argument("--rows", type=int, default=2000, help="Sample rows to embed")
+    quant_parser.add_argument("--batch-size", type=int, default=64)
+    quant_parser.add_argument("--k", type=int, default=10, help="Cut-off for precision@k and recall@k")
+    quant_parser.add_argument("--queries", nargs="*", help="Extra semantic queries to compare neighbours for")
+    quant_parser.add_argument("--output", help="Write results as JSON")
+    
+    embed_bench_parser = subparsers.add_parser("bench-embed", help="Embedding throughput sweep without Weaviate")
+    embed_bench_parser.add_argument("csv_file", help="Dataset to sample texts from")
+    embed_bench_parser.add_argument("--rows", type=int, default=2000, help="Sample rows to embed per configuration")
+    embed_bench_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    embed_bench_parser.add_argument("--threads", type=int, nargs="+", help="torch.set_num_threads values (default: physical cores)")
+    embed_bench_parser.add_argument("--models", nargs="+", help=f"Models to sweep (default: {EMBED_MODELS[0]})")
+    embed_bench_parser.add_argument("--all-models", action="store_true", help="Sweep every model in EMBED_MODELS")
+    embed_bench_parser.add_argument("--backends", nargs="+", choices=EMBEDDER_BACKENDS, help="Backends to sweep (default: sentence-transformers, hash)")
+    embed_bench_parser.add_argument("--template", choices=list(FLOW_TEXT_TEMPLATES), default="full")
+    embed_bench_parser.add_argument("--embed-dim", type=int, default=DEFAULT_HASH_DIMENSION, help="Vector size for the hash backend")
+    embed_bench_parser.add_argument("--output", default="embed_benchmark.json", help="Results file (.json or .csv)")
+    
+    server_parser = subparsers.add_parser("embed-server", help="Keep embedding models loaded behind a Unix socket")
+    server_parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Socket path to listen on")
+    server_parser.add_argument("--embedder", choices=EMBEDDER_BACKENDS, default="sentence-transformers", help="Backend to preload")
+    server_parser.add_argument("--preload", nargs="*", default=[DEFAULT_MODEL], help="Models loaded at startup (others load on first request)")
+    server_parser.add_argument("--embed-dim", type=int, default=DEFAULT_HASH_DIMENSION, help="Vector size for the hash backend")
+    server_parser.add_argument("--max-batch", type=int, default=256, help="Most texts merged into one encode() call")
+    server_parser.add_argument("--max-wait-ms", type=float, default=5.0, help="How long the first request waits for others to join its batch")
+    
+    import_time_parser = subparsers.add_parser("import-time", help="Check that CLI modules import without heavy dependencies")
+    import_time_parser.add_argument("--modules", nargs="+", help="Modules to import (default: main ingest query benchmark)")
+    import_time_parser.add_argument("--budget-ms", type=float, help="Fail when a module's import takes longer")
+    
+    update_parser = subparsers.add_parser("update", parents=[embedder_parser, concurrency_parser],
+                                          help="Set frame_length on a protocol's flows",
+                                          description="Set frame_length on a protocol's flows with batch upserts. Each object "
+                                                      "is rewritten whole from the snapshot fetched for its page, so writes "
+                                                      "made to it in between are lost (--patch avoids this). Every run pages "
+                                                      "through the ids of all IPFlow objects, however rare the protocol.")
     update_parser.add_argument("protocol", help="Protocol for which to be updated")
     update_parser.add_argument("new_packet_size", type=int, help="New packet size")
+    update_parser.add_argument("--batch-size", type=int, default=500, help="Ids per cursor page and per batch upsert")
+    update_parser.add_argument("--workers", type=int, default=4, help="Concurrent fetch + upsert workers")
+    update_parser.add_argument("--reembed", action="store_true", help="Re-encode the updated flows so their vectors match")
+    update_parser.add_argument("--patch", dest="write", action="store_const", const="patch", default="batch",
+                               help="PATCH (merge) each object instead of batch upserts: no lost updates, one request "
+                                    "per object; cannot be combined with --reembed")
+    update_parser.add_argument("--flow-template", choices=list(FLOW_TEXT_TEMPLATES), default="full",
+                               help="Serializer the flows were ingested with (for --reembed)")
+    update_parser.add_argument("--embed-batch-size", type=int, default=64, help="Batch size passed to encode()")
     
-    delete_parser = subparsers.add_parser("delete")
+    # Key-addressed variants: object ids are computed from dataset id + frame number
+    update_frames_parser = subparsers.add_parser(
+        "update-frames", parents=[concurrency_parser], help="Update flows by frame number, no lookup queries",
+        description="Set frame_length on flows addressed by frame number, one fetch and one batch upsert per batch of "
+                    "ids. Each object is rewritten whole from the fetched snapshot, so writes made to it in between are "
+                    "lost (--patch avoids this). The stored vectors are kept as they are, so the flow text they were "
+                    "embedded from still shows the old length; run 'update PROTOCOL N --reembed' to rebuild them.")
+    update_frames_parser.add_argument("dataset_id", help="Dataset id used at ingest (default there: CSV file name without extension)")
+    update_frames_parser.add_argument("frames", nargs="+", help="Frame numbers or inclusive ranges, e.g. 17 100-200 5,9")
+    update_frames_parser.add_argument("--frame-length", type=int, required=True, help="New frame length")
+    update_frames_parser.add_argument("--batch-size", type=int, default=500, help="Ids per fetch and per batch upsert")
+    update_frames_parser.add_argument("--workers", type=int, default=4, help="Concurrent fetch + upsert workers")
+    update_frames_parser.add_argument("--patch", dest="write", action="store_const", const="patch", default="batch",
+                                      help="PATCH (merge) each object instead of batch upserts: no lost updates, one "
+                                           "request per object")
+    update_frames_parser.add_argument("--max-frames", type=int,
+                                      help="Refuse frame specs covering more frames than this (default 100000)")
+    
+    delete_frames_parser = subparsers.add_parser("delete-frames", help="Delete flows by frame number, no lookup queries")
+    delete_frames_parser.add_argument("dataset_id", help="Dataset id used at ingest (default there: CSV file name without extension)")
+    delete_frames_parser.add_argument("frames", nargs="+", help="Frame numbers or inclusive ranges, e.g. 17 100-200 5,9")
+    delete_frames_parser.add_argument("--dry-run", action="store_true", help="Only count the flows that would be deleted")
+    delete_frames_parser.add_argument("--verbose", action="store_true", help="Ask the server for per-object results")
+    delete_frames_parser.add_argument("--max-frames", type=int, help="Refuse frame specs covering more frames than this (default 100000)")
+    
+    delete_parser = subparsers.add_parser("delete", parents=[concurrency_parser])
     delete_parser.add_argument("protocol_number", help="Delete flows with protocol number")
+    delete_parser.add_argument("--dry-run", action="store_true", help="Only count the flows that would be deleted")
+    delete_parser.add_argument("--verbose", action="store_true", help="Ask the server for per-object results (ids of failures)")
+    delete_parser.add_argument("--workers", type=int, default=1, help="Concurrent delete workers, one cursor page each (1: single request stream)")
+    delete_parser.add_argument("--batch-size", type=int, default=1000, help="Ids per cursor page with --workers > 1")
     
     args = parser.parse_args()
+    
+    if hasattr(args, "embed_server"):
+        import resources
+        resources.configure_embedder(backend=args.embedder, model_name=args.embed_model, dimension=args.embed_dim,
+                                     server_socket=None if args.no_embed_server else args.embed_server)
 
     if args.command == "ingest":
-        insert_ip_flows(args.csv_file)
+        from ingest import insert_ip_flows
+        insert_ip_flows(
+            args.csv_file,
+            chunk_size=args.chunk_size,
+            embed_batch_size=args.embed_batch_size,
+            import_mode=args.import_mode,
+            import_batch_size=args.import_batch_size,
+            dynamic_batching=not args.no_dynamic_batching,
+            num_workers=args.import_workers,
+            pipelined=args.pipelined,
+            queue_size=args.queue_size,
+            embed_workers=args.embed_workers,
+            cache_dir=args.embed_cache,
+            cache_max_mb=args.embed_cache_mb,
+            aggregate=args.aggregate,
+            dataset_id=args.dataset_id,
+            resume=args.resume,
+            checkpoint_file=args.checkpoint_file,
+            checkpoint_every=args.checkpoint_every,
+            vector_mode=args.vector_mode,
+            field_cache_size=args.field_cache_size,
+            flow_template=args.flow_template
+        )
         print("IP Flow ingestion complete!")
         
     elif args.command == "query":
-        result = semantic_query_ip_flow(args.query_text)
+        from query import semantic_query_ip_flow, semantic_query_flow_aggregate
+        if args.aggregated:
+            result = semantic_query_flow_aggregate(args.query_text)
+            class_name = "IPFlowAggregate"
+        else:
+            result = semantic_query_ip_flow(args.query_text)
+            class_name = "IPFlow"
         print("Semantic Query Results:")
-        for obj in result.get("data", {}).get("Get", {}).get("IPFlow", []):
+        for obj in result.get("data", {}).get("Get", {}).get(class_name, []):
+            print(obj)
+            
+    elif args.command == "feature-query":
+        from query import feature_query_ip_flow
+        result = feature_query_ip_flow(
+            limit=args.limit,
+            source_ip=args.source_ip,
+            destination_ip=args.destination_ip,
+            source_port=args.source_port,
+            destination_port=args.destination_port,
+            protocol=args.protocol,
+            frame_length=args.frame_length,
+            time_of_day=args.time_of_day
+        )
+        print("Feature Query Results:")
+        for obj in result.get("data", {}).get("Get", {}).get("IPFlowFeatures", []):
             print(obj)
             
     elif args.command == "benchmark":
+        from query import semantic_query_ip_flow
+        from benchmark import benchmark_query
         query_results = []
         total_time = 0
         
@@ -170,13 +367,118 @@ def main():
                 print(f"  {obj}")
                 print(f"  Similarity Score: {similarity:.4f}")
                 
+    elif args.command == "generate":
+        if args.rows <= 0 or args.chunk_size <= 0:
+            parser.error("--rows and --chunk-size must be positive")
+        from generate import generate_ip_flows
+        generate_ip_flows(
+            args.output_file,
+            args.rows,
+            seed=args.seed,
+            num_hosts=args.hosts,
+            zipf_exponent=args.zipf_exponent,
+            chunk_size=args.chunk_size,
+            mean_burst_packets=args.mean_burst_packets,
+            output_format=args.format
+        )
+        
+    elif args.command == "bench-templates":
+        from embed_bench import benchmark_flow_templates
+        benchmark_flow_templates(
+            args.csv_file,
+            resources.configured_embed_model(),
+            rows=args.rows,
+            batch_size=args.batch_size,
+            k=args.k,
+            templates=args.templates,
+            output_file=args.output
+        )
+        
+    elif args.command == "bench-quant":
+        from embed_bench import benchmark_quantization
+        benchmark_quantization(
+            args.csv_file,
+            args.embed_model,
+            rows=args.rows,
+            batch_size=args.batch_size,
+            k=args.k,
+            queries=args.queries,
+            output_file=args.output
+        )
+        
+    elif args.command == "bench-embed":
+        from embed_bench import benchmark_embedding_sweep
+        benchmark_embedding_sweep(
+            args.csv_file,
+            rows=args.rows,
+            batch_sizes=args.batch_sizes,
+            thread_counts=args.threads,
+            models=EMBED_MODELS if args.all_models else args.models,
+            backends=args.backends,
+            template=args.template,
+            hash_dimension=args.embed_dim,
+            output_file=args.output
+        )
+        
+    elif args.command == "embed-server":
+        from embed_server import serve as serve_embeddings
+        serve_embeddings(
+            args.socket,
+            preload=[(args.embedder, model_name, args.embed_dim) for model_name in args.preload],
+            max_batch_texts=args.max_batch,
+            max_wait_ms=args.max_wait_ms
+        )
+        
+    elif args.command == "import-time":
+        import os
+        import sys
+        from import_time import check_import_time
+        if not check_import_time(args.modules, budget_ms=args.budget_ms, cwd=os.path.dirname(os.path.abspath(__file__))):
+            sys.exit(1)
+        
     elif args.command == "update":
+        from query import update_ip_flow
+        from benchmark import benchmark_crud_operation
+        if args.reembed and args.write == "patch":
+            parser.error("--patch cannot be combined with --reembed")
         print("Starting CRUD operation benchmark (UPDATE)...")
-        benchmark_crud_operation(update_ip_flow, args.protocol, args.new_packet_size)
+        benchmark_crud_operation(functools.partial(update_ip_flow, max_in_flight=args.max_in_flight, mode=args.mode,
+                                                   write=args.write),
+                                 args.protocol, args.new_packet_size, args.batch_size, args.workers,
+                                 args.reembed, args.flow_template, args.embed_batch_size)
+        
+    elif args.command == "update-frames":
+        from query import update_ip_flows_by_frame
+        from keyed_crud import parse_key_ranges, MAX_KEYS
+        from benchmark import benchmark_crud_operation
+        try:
+            frame_numbers = parse_key_ranges(args.frames, max_keys=args.max_frames or MAX_KEYS)
+        except ValueError as e:
+            parser.error(f"{e} (--max-frames)")
+        print("Starting CRUD operation benchmark (UPDATE by frame number)...")
+        benchmark_crud_operation(functools.partial(update_ip_flows_by_frame, batch_size=args.batch_size, write=args.write),
+                                 args.dataset_id, frame_numbers, args.frame_length, args.workers,
+                                 args.max_in_flight, args.mode)
+        
+    elif args.command == "delete-frames":
+        from query import delete_ip_flows_by_frame
+        from keyed_crud import parse_key_ranges, MAX_KEYS
+        from benchmark import benchmark_crud_operation
+        try:
+            frame_numbers = parse_key_ranges(args.frames, max_keys=args.max_frames or MAX_KEYS)
+        except ValueError as e:
+            parser.error(f"{e} (--max-frames)")
+        print("Starting CRUD operation benchmark (DELETE by frame number)...")
+        benchmark_crud_operation(delete_ip_flows_by_frame, args.dataset_id, frame_numbers,
+                                 args.dry_run, "verbose" if args.verbose else "minimal")
         
     elif args.command == "delete":
+        from query import delete_ip_flow
+        from benchmark import benchmark_crud_operation
         print("Starting CRUD operation benchmark (DELETE)...")
-        benchmark_crud_operation(delete_ip_flow, args.protocol_number)
+        benchmark_crud_operation(functools.partial(delete_ip_flow, num_workers=args.workers, batch_size=args.batch_size,
+                                                   max_in_flight=args.max_in_flight, mode=args.mode),
+                                 args.protocol_number, args.dry_run, "verbose" if args.verbose else "minimal")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+# parallel.py - concurrent Weaviate REST requests over one pooled HTTP session
+#
+# weaviate.Client (v3) sends one blocking request at a time, so maintenance jobs
+# are bound by round-trip latency. WeaviateSession keeps a pool of keep-alive
+# connections sized for the worker count; run_operations drives any number of
+# request-making callables through it from a thread pool or an asyncio loop.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from resources import DEFAULT_WEAVIATE_URL
+
+EXECUTION_MODES = ["threads", "asyncio"]
+
+
+class WeaviateSession:
+    """
+    The REST calls the CRUD engines need, on a requests.Session with pool_size
+    connections. `headers` are sent with every request; bearer_token, if given,
+    is called per request for the Authorization header so refreshed tokens
+    are picked up.
+    """
+
+    def __init__(self, url=DEFAULT_WEAVIATE_URL, pool_size=8, timeout=(5, 120), retries=3, headers=None,
+                 bearer_token=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = url.rstrip("/") + "/v1"
+        self.timeout = timeout
+        self.bearer_token = bearer_token
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # Retry only connection errors and gateway hiccups; 4xx answers are real results
+        retry = Retry(total=retries, connect=retries, read=0, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504), allowed_methods=None, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_client(cls, client, **kwargs):
+        """
+        A session to the same server as a weaviate.Client, so reads and writes
+        hit one instance, with its additional headers (API keys for modules,
+        a static Authorization) and its current bearer token (API key or OIDC)
+        """
+        connection = client._connection
+        return cls(connection.url, headers=connection._get_request_header(),
+                   bearer_token=connection.get_current_bearer_token, **kwargs)
+
+    def _request(self, method, path, **kwargs):
+        if self.bearer_token is not None:
+            token = self.bearer_token()
+            if token:
+                kwargs["headers"] = {"authorization": token}
+        response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def graphql(self, query):
+        data = self._request("POST", "/graphql", json={"query": query}).json()
+        if data.get("errors"):
+            raise RuntimeError(f"GraphQL query failed: {data['errors']}")
+        return data
+
+    def batch_objects(self, objects):
+        """POST /v1/batch/objects; objects are {'class', 'id', 'properties', 'vector'} dicts. Returns per-object results"""
+        return self._request("POST", "/batch/objects", json={"objects": objects}).json()
+
+    def batch_delete(self, class_name, where, output="minimal", dry_run=False):
+        return self._request("DELETE", "/batch/objects", json={
+            "match": {"class": class_name, "where": where}, "output": output, "dryRun": dry_run}).json()
+
+    def patch_object(self, class_name, object_id, properties):
+        self._request("PATCH", f"/objects/{class_name}/{object_id}", json={"class": class_name, "properties": properties})
+
+    def delete_object(self, class_name, object_id):
+        self._request("DELETE", f"/objects/{class_name}/{object_id}")
+
+    def close(self):
+        self.session.close()
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class _Recorder:
+    """Thread-safe collection of results, ordered errors and per-worker timings"""
+
+    def __init__(self, on_result):
+        self.on_result = on_result
+        self.lock = threading.Lock()
+        self.results = {}
+        self.errors = []
+        self.workers = {}
+
+    def run(self, index, key, operation):
+        worker = threading.current_thread().name
+        start = time.perf_counter()
+        try:
+            result = operation()
+            error = None
+        except Exception as e:
+            result, error = None, e
+        latency = time.perf_counter() - start
+        with self.lock:
+            worker_stats = self.workers.setdefault(worker, {'operations': 0, 'failed': 0, 'latencies': []})
+            worker_stats['operations'] += 1
+            worker_stats['latencies'].append(latency)
+            if error is None:
+                self.results[index] = result
+            else:
+                worker_stats['failed'] += 1
+                self.errors.append((index, key, error))
+        if error is None and self.on_result is not None:
+            self.on_result(key, result)
+
+    def stats(self, seconds):
+        workers = {}
+        for worker, worker_stats in sorted(self.workers.items()):
+            latencies = sorted(worker_stats['latencies'])
+            busy = sum(latencies)
+            workers[worker] = {
+                'operations': worker_stats['operations'],
+                'failed': worker_stats['failed'],
+                'busy_seconds': busy,
+                'operations_per_second': worker_stats['operations'] / busy if busy else 0.0,
+                'latency_ms_mean': busy / len(latencies) * 1000,
+                'latency_ms_p50': _percentile(latencies, 0.50) * 1000,
+                'latency_ms_p95': _percentile(latencies, 0.95) * 1000,
+            }
+        operations = sum(worker_stats['operations'] for worker_stats in workers.values())
+        return {
+            'operations': operations,
+            'failed': len(self.errors),
+            'seconds': seconds,
+            'operations_per_second': operations / seconds if seconds else 0.0,
+            'results': [self.results[index] for index in sorted(self.results)],
+            'errors': sorted(self.errors, key=lambda error: error[0]),
+            'workers': workers,
+        }
+
+
+def _run_threads(operations, recorder, num_workers, max_in_flight):
+    pending = set()
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="worker") as executor:
+        for index, (key, operation) in enumerate(operations):
+            pending.add(executor.submit(recorder.run, index, key, operation))
+            if len(pending) >= max_in_flight:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+        wait(pending)
+
+
+async def _run_asyncio(operations, recorder, num_workers, max_in_flight):
+    # requests is blocking, so the loop hands each call to a bounded executor;
+    # the semaphore caps requests in flight independently of the worker count
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="worker") as executor:
+        async def run_one(index, key, operation):
+            try:
+                await loop.run_in_executor(executor, recorder.run, index, key, operation)
+            finally:
+                in_flight.release()
+
+        # The source may block (e.g. a cursor page fetch), so it is advanced off the loop too
+        iterator = iter(operations)
+        index = 0
+        while True:
+            await in_flight.acquire()
+            item = await loop.run_in_executor(None, next, iterator, None)
+            if item is None:
+                in_flight.release()
+                break
+            key, operation = item
+            task = asyncio.create_task(run_one(index, key, operation))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            index += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+def run_operations(operations, num_workers=4, max_in_flight=None, mode="threads", on_result=None):
+    """
+    Run an iterable of (key, callable) pairs, each callable making its own
+    requests, with num_workers concurrent workers and at most max_in_flight
+    (default 2 x num_workers) submitted but unfinished. The iterable is
+    consumed lazily, so it can stream from a cursor.
+
+    A failing operation does not stop the others. Returns a stats dict:
+    results in submission order, errors as (index, key, exception) in
+    submission order, and per-worker throughput and latency.
+    """
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode '{mode}', expected one of {EXECUTION_MODES}")
+    max_in_flight = max(max_in_flight or 2 * num_workers, 1)
+    recorder = _Recorder(on_result)
+    start = time.perf_counter()
+    if mode == "asyncio":
+        import asyncio
+
+        asyncio.run(_run_asyncio(operations, recorder, num_workers, max_in_flight))
+    else:
+        _run_threads(operations, recorder, num_workers, max_in_flight)
+    return recorder.stats(time.perf_counter() - start)
+
+
+def print_worker_stats(stats):
+    print(f"{stats['operations']} requests in {stats['seconds']:.2f}s "
+          f"({stats['operations_per_second']:.1f}/sec), {stats['failed']} failed")
+    for worker, worker_stats in stats['workers'].items():
+        print(f"  {worker:<12} {worker_stats['operations']:>7} requests  {worker_stats['operations_per_second']:>8.1f}/sec busy  "
+              f"latency mean {worker_stats['latency_ms_mean']:.1f} ms, p50 {worker_stats['latency_ms_p50']:.1f} ms, "
+              f"p95 {worker_stats['latency_ms_p95']:.1f} ms  ({worker_stats['failed']} failed)")
+    for index, key, error in stats['errors'][:10]:
+        print(f"  #{index} {key}: {error}")
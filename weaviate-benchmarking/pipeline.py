@@ -0,0 +1,137 @@
+# pipeline.py - pipelined ingestion (read -> embed -> upload)
+import queue
+import threading
+import time
+
+# Marker passed down the queues once a stage has no more work
+_END = object()
+
+
+def _put(target_queue, item, abort):
+    """Blocking put that gives up when another stage has failed"""
+    while not abort.is_set():
+        try:
+            target_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(source_queue, abort):
+    """Blocking get that gives up when another stage has failed"""
+    while not abort.is_set():
+        try:
+            return source_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _new_stage_stats(name):
+    return {
+        'name': name,
+        'items': 0,
+        'busy_seconds': 0.0,     # time spent doing the stage's own work
+        'wait_in_seconds': 0.0,  # time blocked waiting for upstream
+        'wait_out_seconds': 0.0, # time blocked on a full downstream queue
+        'error': None
+    }
+
+
+def _run_source(source, out_queue, stats, abort):
+    try:
+        iterator = iter(source)
+        while not abort.is_set():
+            work_start = time.time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats['busy_seconds'] += time.time() - work_start
+                break
+            stats['busy_seconds'] += time.time() - work_start
+            stats['items'] += 1
+
+            put_start = time.time()
+            if not _put(out_queue, item, abort):
+                return
+            stats['wait_out_seconds'] += time.time() - put_start
+    except Exception as e:
+        stats['error'] = e
+        abort.set()
+    finally:
+        _put(out_queue, _END, abort)
+
+
+def _run_stage(work, in_queue, out_queue, stats, abort):
+    try:
+        while True:
+            get_start = time.time()
+            item = _get(in_queue, abort)
+            stats['wait_in_seconds'] += time.time() - get_start
+            if item is _END:
+                break
+
+            work_start = time.time()
+            result = work(item)
+            stats['busy_seconds'] += time.time() - work_start
+            stats['items'] += 1
+
+            if out_queue is not None:
+                put_start = time.time()
+                if not _put(out_queue, result, abort):
+                    return
+                stats['wait_out_seconds'] += time.time() - put_start
+    except Exception as e:
+        stats['error'] = e
+        abort.set()
+    finally:
+        if out_queue is not None:
+            _put(out_queue, _END, abort)
+
+
+def run_pipeline(source, embed, upload, queue_size=4):
+    """
+    Run reader, embedding and upload stages concurrently.
+
+    `source` is an iterable of chunks, `embed` maps a chunk to whatever
+    `upload` consumes. Stages are joined by bounded queues of `queue_size`
+    chunks so a slow stage applies backpressure to the ones before it.
+    Returns (wall_seconds, [stage stats]); the first stage error is re-raised.
+    """
+    abort = threading.Event()
+    embed_queue = queue.Queue(maxsize=queue_size)
+    upload_queue = queue.Queue(maxsize=queue_size)
+
+    reader_stats = _new_stage_stats('reader')
+    embed_stats = _new_stage_stats('embed')
+    upload_stats = _new_stage_stats('upload')
+
+    threads = [
+        threading.Thread(target=_run_source, args=(source, embed_queue, reader_stats, abort), daemon=True),
+        threading.Thread(target=_run_stage, args=(embed, embed_queue, upload_queue, embed_stats, abort), daemon=True),
+        threading.Thread(target=_run_stage, args=(upload, upload_queue, None, upload_stats, abort), daemon=True),
+    ]
+
+    start_time = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.time() - start_time
+
+    stage_stats = [reader_stats, embed_stats, upload_stats]
+    for stats in stage_stats:
+        if stats['error'] is not None:
+            raise stats['error']
+    return wall_seconds, stage_stats
+
+
+def print_stage_stats(wall_seconds, stage_stats):
+    print(f"\n=== PIPELINE STAGE UTILISATION ===")
+    for stats in stage_stats:
+        busy_percent = (stats['busy_seconds'] / wall_seconds) * 100 if wall_seconds > 0 else 0
+        print(f"{stats['name']:>7}: {stats['items']} chunks, busy {stats['busy_seconds']:.2f}s ({busy_percent:.1f}%), "
+              f"waiting on input {stats['wait_in_seconds']:.2f}s, blocked on output {stats['wait_out_seconds']:.2f}s")
+    bottleneck = max(stage_stats, key=lambda stats: stats['busy_seconds'])
+    print(f"Bottleneck stage: {bottleneck['name']}")
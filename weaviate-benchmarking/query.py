@@ -1,16 +1,54 @@
-from sentence_transformers import SentenceTransformer
-import weaviate
+from resources import get_client
+from bulk_delete import delete_where, delete_where_parallel
+from bulk_update import update_where
+from flow_text import FLOW_TEXT_TEMPLATES, TEMPLATE_FIELDS
+from flow_ids import ip_flow_uuid
+from keyed_crud import delete_by_ids, patch_by_ids
+import resources
+
+
+def semantic_query_ip_flow(query_text, limit=5, embed_model=None, client=None):
+    """embed_model / client default to the process's shared instances (see resources)"""
+    client = client or get_client()
+    query_vector = (embed_model or resources.configured_embed_model()).encode(query_text).tolist()
+    result = (
+        client.query
+        .get("IPFlow", ["frame_number", "frame_time", "source_ip", "destination_ip",
+                        "source_port", "destination_port", "protocol", "frame_length"])
+        .with_near_vector({"vector": query_vector})
+        .with_additional(["distance"])
+        .with_limit(limit)
+        .do()
+    )
+    return result
+
+
+def semantic_query_flow_aggregate(query_text, limit=5, embed_model=None, client=None):
+    client = client or get_client()
+    query_vector = (embed_model or resources.configured_embed_model()).encode(query_text).tolist()
+    result = (
+        client.query
+        .get("IPFlowAggregate", ["source_ip", "destination_ip", "source_port", "destination_port", "protocol",
+                                 "first_time", "last_time", "packet_count", "total_bytes",
+                                 "min_frame_length", "max_frame_length", "mean_frame_length"])
+        .with_near_vector({"vector": query_vector})
+        .with_additional(["distance"])
+        .with_limit(limit)
+        .do()
+    )
+    return result
 
 
-client = weaviate.Client("http://localhost:8080")
-embed_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+def feature_query_ip_flow(limit=5, client=None, **fields):
+    """Nearest flows in IPFlowFeatures to a vector built from the given fields (see query_feature_vector)"""
+    from features import FEATURE_CLASS, query_feature_vector
 
-def semantic_query_ip_flow(query_text, limit=5):
-    query_vector = embed_model.encode(query_text).tolist()
+    client = client or get_client()
+    query_vector = query_feature_vector(**fields).tolist()
     result = (
         client.query
-        .get("IPFlow", ["frame_number", "frame_time", "source_ip", "destination_ip",
-                        "source_port", "destination_port", "protocol", "frame_length"])
+        .get(FEATURE_CLASS, ["frame_number", "frame_time", "source_ip", "destination_ip",
+                             "source_port", "destination_port", "protocol", "frame_length"])
         .with_near_vector({"vector": query_vector})
         .with_additional(["distance"])
         .with_limit(limit)
@@ -19,89 +57,96 @@ def semantic_query_ip_flow(query_text, limit=5):
     return result
 
 
-def update_ip_flow(protocol, new_frame_length, batch_size=100):
-    normalized_protocol = protocol.strip().upper()
-    offset = 0
-    update_count = 0
-
-    while True:
-        try:
-            response = client.query.get(
-                "IPFlow",
-                ["protocol", "frame_length", "_additional { id }"]
-            ).with_where({
-                "path": ["protocol"],
-                "operator": "Equal",
-                "valueString": normalized_protocol
-            }).with_limit(batch_size).with_offset(offset).do()
-
-            matching_records = response.get("data", {}).get("Get", {}).get("IPFlow", [])
-            if not matching_records:
-                break  # No more records
-
-            print(f"Batch at offset {offset}: Found {len(matching_records)} records")
-
-            for record in matching_records:
-                record_id = record["_additional"]["id"]
-                current_length = record.get("frame_length")
-
-                if current_length != new_frame_length:
-                    try:
-                        client.data_object.update(
-                            {"frame_length": new_frame_length},
-                            class_name="IPFlow",
-                            uuid=record_id
-                        )
-                        update_count += 1
-                        print(f"Updated record {record_id} from {current_length} to {new_frame_length}")
-                    except Exception as e:
-                        print(f"Error updating record {record_id}: {e}")
-
-            offset += batch_size
-
-        except Exception as e:
-            print(f"Error during batch update at offset {offset}: {e}")
-            break
-
-    print(f"Total records updated: {update_count}")
-
-
-def delete_ip_flow(protocol_name, batch_size=100):
-    normalized_protocol = protocol_name.strip().upper()
-    offset = 0
-    delete_count = 0
-
-    while True:
-        try:
-            response = client.query.get(
-                "IPFlow",
-                ["protocol", "_additional { id }"]
-            ).with_where({
-                "path": ["protocol"],
-                "operator": "Equal",
-                "valueString": normalized_protocol
-            }).with_limit(batch_size).with_offset(offset).do()
-
-            matching_records = response.get("data", {}).get("Get", {}).get("IPFlow", [])
-            if not matching_records:
-                break 
-
-            print(f" Found {len(matching_records)} records")
-
-            for record in matching_records:
-                record_id = record["_additional"]["id"]
-                try:
-                    client.data_object.delete(
-                        record_id,
-                        class_name="IPFlow"
-                    )
-                    delete_count += 1
-                    print(f"Deleted record {record_id}")
-                except Exception as e:
-                    print(f"Error deleting record {record_id}: {e}")
-
-        except Exception as e:
-            print(f"Error during batch delete at offset {offset}: {e}")
-            break
-
-    print(f"Total records deleted: {delete_count}")
+def protocol_filter(protocol):
+    return {"path": ["protocol"], "operator": "Equal", "valueString": protocol.strip().upper()}
+
+
+def flow_reembedder(patch, flow_template="full", embed_model=None, batch_size=64):
+    """
+    revectorize callback for update_where that rebuilds each patched flow's
+    text and re-encodes the page in one call, or None when no patched field
+    appears in the template (the stored vectors are then still correct).
+    """
+    stale_fields = set(patch) & TEMPLATE_FIELDS[flow_template]
+    if not stale_fields:
+        print(f"{', '.join(sorted(patch))} not part of the '{flow_template}' flow text, keeping stored vectors")
+        return None
+    text_builder = FLOW_TEXT_TEMPLATES[flow_template]
+
+    def reembed(objects):
+        flow_texts = [text_builder(obj['properties']) for obj in objects]
+        vectors = (embed_model or resources.configured_embed_model()).encode(flow_texts, batch_size=batch_size)
+        return [vector.tolist() for vector in vectors]
+
+    print(f"Re-embedding updated flows ('{flow_template}' text uses {', '.join(sorted(stale_fields))})")
+    return reembed
+
+
+def update_ip_flow(protocol, new_frame_length, batch_size=500, num_workers=4, reembed=False, flow_template="full",
+                   embed_batch_size=64, embed_model=None, client=None, max_in_flight=None, mode="threads", write="batch"):
+    """
+    Set frame_length on every IPFlow of a protocol with concurrent batch upserts,
+    or per-object PATCHes with write="patch" (see bulk_update.py). With reembed
+    the vectors are rebuilt from the new flow text so semantic queries see the
+    change; flow_template must match the one used at ingest.
+    """
+    client = client or get_client()
+    patch = {"frame_length": new_frame_length}
+    revectorize = flow_reembedder(patch, flow_template, embed_model, embed_batch_size) if reembed else None
+    try:
+        stats = update_where(client, "IPFlow", protocol_filter(protocol), patch,
+                             page_size=batch_size, num_workers=num_workers, max_in_flight=max_in_flight, mode=mode,
+                             revectorize=revectorize, write=write)
+    except Exception as e:
+        print(f"Error during batch update: {e}")
+        return None
+
+    print(f"Total records updated: {stats['updated']}")
+    if stats['failed'] or stats['failed_batches']:
+        print(f"WARNING: update incomplete, {stats['failed']} objects and {stats['failed_batches']} whole batches failed")
+    return stats
+
+
+def delete_ip_flow(protocol_name, dry_run=False, output="minimal", client=None, num_workers=1, batch_size=1000,
+                   max_in_flight=None, mode="threads"):
+    """
+    Delete every IPFlow of a protocol with server-side batch deletes (see
+    bulk_delete.py): one capped request stream by default, or with
+    num_workers > 1 concurrent deletes of batch_size-id cursor pages.
+    """
+    client = client or get_client()
+    try:
+        if num_workers > 1 and not dry_run:
+            stats = delete_where_parallel(client, "IPFlow", protocol_filter(protocol_name), page_size=batch_size,
+                                          num_workers=num_workers, max_in_flight=max_in_flight, mode=mode, output=output)
+        else:
+            stats = delete_where(client, "IPFlow", protocol_filter(protocol_name), dry_run=dry_run, output=output)
+    except Exception as e:
+        print(f"Error during batch delete: {e}")
+        return None
+
+    if not dry_run:
+        print(f"Total records deleted: {stats['deleted']}")
+        if stats['failed'] or stats.get('failed_requests'):
+            print(f"WARNING: delete incomplete, {stats['failed']} objects and "
+                  f"{stats.get('failed_requests', 0)} whole requests failed")
+    return stats
+
+
+def update_ip_flows_by_frame(dataset_id, frame_numbers, new_frame_length, num_workers=4, max_in_flight=None, mode="threads",
+                             client=None, batch_size=500, write="batch"):
+    """
+    Set frame_length on the given frames of an ingested dataset. Object ids come
+    from flow_ids.ip_flow_uuid, so no id lookup is needed. The write keeps the
+    stored vector; use update_ip_flow(..., reembed=True) to rebuild it.
+    """
+    ids = [ip_flow_uuid(dataset_id, frame_number) for frame_number in frame_numbers]
+    return patch_by_ids(client or get_client(), "IPFlow", ids, {"frame_length": new_frame_length}, batch_size=batch_size,
+                        num_workers=num_workers, max_in_flight=max_in_flight, mode=mode, write=write)
+
+
+def delete_ip_flows_by_frame(dataset_id, frame_numbers, dry_run=False, output="minimal", client=None):
+    """Delete the given frames of an ingested dataset by their deterministic ids"""
+    client = client or get_client()
+    ids = [ip_flow_uuid(dataset_id, frame_number) for frame_number in frame_numbers]
+    return delete_by_ids(client, "IPFlow", ids, dry_run=dry_run, output=output)
@@ -0,0 +1,58 @@
+# resources.py - process-wide Weaviate clients and embedders, built on first use
+#
+# Constructing a weaviate.Client contacts the server and loading a
+# sentence-transformers model pulls in torch; neither should happen just
+# because a module was imported. Every module asks this factory instead, so
+# each client / embedder is created once per process and only when needed.
+import os
+import threading
+
+from embedders import DEFAULT_MODEL, DEFAULT_HASH_DIMENSION
+from embed_server import DEFAULT_SOCKET_PATH
+
+DEFAULT_WEAVIATE_URL = os.environ.get("WEAVIATE_URL", "http://localhost:8080")
+
+_clients = {}
+_embedders = {}
+_lock = threading.Lock()
+
+
+def get_client(url=DEFAULT_WEAVIATE_URL):
+    with _lock:
+        if url not in _clients:
+            import weaviate
+
+            _clients[url] = weaviate.Client(url)
+        return _clients[url]
+
+
+def get_embed_model(backend, model_name, dimension, server_socket=None):
+    """The embedding daemon's RemoteEmbedder when one is listening on server_socket, else a local embedder"""
+    key = (backend, model_name, dimension, server_socket)
+    with _lock:
+        if key not in _embedders:
+            from embed_server import connect_embedder
+            from embedders import get_embedder
+
+            _embedders[key] = (connect_embedder(backend, model_name, dimension, socket_path=server_socket)
+                               or get_embedder(backend, model_name, dimension))
+        return _embedders[key]
+
+
+# The process's embedder selection (main.py sets it from the CLI flags); the
+# modules that embed without being handed a model all use this one
+embedder_options = {"backend": "sentence-transformers", "model_name": DEFAULT_MODEL, "dimension": DEFAULT_HASH_DIMENSION}
+embed_server_socket = DEFAULT_SOCKET_PATH
+
+
+def configure_embedder(backend="sentence-transformers", model_name=DEFAULT_MODEL, dimension=DEFAULT_HASH_DIMENSION,
+                       server_socket=DEFAULT_SOCKET_PATH):
+    """server_socket: embedding daemon to use when it is running (None always loads the model here)"""
+    global embed_server_socket
+    embedder_options.update(backend=backend, model_name=model_name, dimension=dimension)
+    embed_server_socket = server_socket
+
+
+def configured_embed_model():
+    """get_embed_model for the configured selection"""
+    return get_embed_model(server_socket=embed_server_socket, **embedder_options)
@@ -0,0 +1,31 @@
+# scan.py - stream the ids of every object of a class with the `after` cursor
+#
+# Offset paging (with_offset) makes the server skip `offset` objects on every
+# page, so a full pass is O(n^2), and it stops at QUERY_MAXIMUM_RESULTS.
+# The cursor API resumes from the last object id instead, keeping each page
+# O(page_size) however large the class is. It cannot be combined with a where
+# filter, so callers filter each page of ids on the server afterwards.
+
+
+def scan_class(client, class_name, page_size=100, stats=None):
+    """
+    Yield the object ids of `class_name` one cursor page (a list) at a time.
+    `stats`, if given, is a dict updated with pages / scanned counts.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(pages=0, scanned=0)
+    after = None
+    while True:
+        request = client.query.get(class_name, ["_additional { id }"]).with_limit(page_size)
+        if after is not None:
+            request = request.with_after(after)
+        response = request.do()
+        if "errors" in response:
+            raise RuntimeError(f"Cursor query on {class_name} failed: {response['errors']}")
+        page = response.get("data", {}).get("Get", {}).get(class_name, [])
+        if not page:
+            return
+        after = page[-1]["_additional"]["id"]
+        stats["pages"] += 1
+        stats["scanned"] += len(page)
+        yield [obj["_additional"]["id"] for obj in page]
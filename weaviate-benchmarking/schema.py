@@ -1,6 +1,6 @@
-import weaviate
+from resources import get_client
 
-client = weaviate.Client("http://localhost:8080")
+client = get_client()
 
 print("Schema recreation logic triggered...")
 
@@ -24,9 +24,37 @@ ip_flow_schema = {
     ]
 }
 
+# One object per 5-tuple flow, built by `main.py ingest --aggregate`
+ip_flow_aggregate_schema = {
+    "class": "IPFlowAggregate",
+    "vectorizer": "none",
+    "properties": [
+        {"name": "source_ip", "dataType": ["string"]},
+        {"name": "destination_ip", "dataType": ["string"]},
+        {"name": "source_port", "dataType": ["int"]},
+        {"name": "destination_port", "dataType": ["int"]},
+        {"name": "protocol", "dataType": ["string"]},
+        {"name": "first_frame_number", "dataType": ["int"]},
+        {"name": "last_frame_number", "dataType": ["int"]},
+        {"name": "first_time", "dataType": ["string"]},
+        {"name": "last_time", "dataType": ["string"]},
+        {"name": "packet_count", "dataType": ["int"]},
+        {"name": "total_bytes", "dataType": ["int"]},
+        {"name": "min_frame_length", "dataType": ["int"]},
+        {"name": "max_frame_length", "dataType": ["int"]},
+        {"name": "mean_frame_length", "dataType": ["number"]},
+    ]
+}
+
+# Same properties as IPFlow, vectors from features.flow_feature_vectors (`--vector-mode features`)
+ip_flow_features_schema = dict(ip_flow_schema, **{"class": "IPFlowFeatures"})
+
 existing_schema = client.schema.get()
-if any(cls["class"] == "IPFlow" for cls in existing_schema.get("classes", [])):
-    print("The 'IPFlow' class already exists.")
-else:
-    client.schema.create_class(ip_flow_schema)
-    print("The 'IPFlow' class has been created successfully!")
\ No newline at end of file
+existing_classes = [cls["class"] for cls in existing_schema.get("classes", [])]
+for class_schema in (ip_flow_schema, ip_flow_aggregate_schema, ip_flow_features_schema):
+    class_name = class_schema["class"]
+    if class_name in existing_classes:
+        print(f"The '{class_name}' class already exists.")
+    else:
+        client.schema.create_class(class_schema)
+        print(f"The '{class_name}' class has been created successfully!")
\ No newline at end of file
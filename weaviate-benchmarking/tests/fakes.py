@@ -0,0 +1,194 @@
+# In-memory stand-ins for the parts of the v3 client and the REST session the CRUD engines use
+import threading
+
+VALUE_KEYS = ("valueText", "valueString", "valueInt", "valueNumber", "valueBoolean", "valueTextArray")
+
+
+def evaluate(where, obj_id, properties):
+    """The subset of Weaviate's where semantics the engines send"""
+    if where is None:
+        return True
+    if where["operator"] in ("And", "Or"):
+        results = [evaluate(operand, obj_id, properties) for operand in where["operands"]]
+        return all(results) if where["operator"] == "And" else any(results)
+    path = where["path"][0]
+    value = obj_id if path == "id" else properties.get(path)
+    expected = next(where[key] for key in VALUE_KEYS if key in where)
+    if where["operator"] == "Equal":
+        return value == expected
+    if where["operator"] == "NotEqual":
+        return value != expected
+    if where["operator"] == "ContainsAny":
+        return value in expected
+    raise NotImplementedError(where["operator"])
+
+
+class GetQuery:
+    def __init__(self, server, class_name, properties):
+        self.server = server
+        self.class_name = class_name
+        self.properties = [name for name in properties if not name.startswith("_")]
+        self.limit = None
+        self.after = None
+        self.where = None
+        self.additional = ["id"]
+
+    def with_limit(self, limit):
+        self.limit = limit
+        return self
+
+    def with_after(self, after):
+        self.after = after
+        return self
+
+    def with_where(self, where):
+        self.where = where
+        return self
+
+    def with_additional(self, additional):
+        self.additional = additional
+        return self
+
+    def build(self):
+        # FakeSession.graphql runs the builder itself instead of a query string
+        return self
+
+    def do(self):
+        assert self.where is None or self.after is None, "the cursor cannot be combined with a filter"
+        with self.server.lock:
+            ids = sorted(obj_id for obj_id in self.server.objects if self.after is None or obj_id > self.after)
+            page = []
+            for obj_id in ids:
+                stored = self.server.objects[obj_id]
+                if not evaluate(self.where, obj_id, stored["properties"]):
+                    continue
+                obj = {name: stored["properties"].get(name) for name in self.properties}
+                obj["_additional"] = {"id": obj_id}
+                if "vector" in self.additional:
+                    obj["_additional"]["vector"] = stored["vector"]
+                page.append(obj)
+        self.server.queries += 1
+        return {"data": {"Get": {self.class_name: page[:self.limit]}}}
+
+
+class AggregateQuery:
+    def __init__(self, server, class_name):
+        self.server = server
+        self.class_name = class_name
+        self.where = None
+
+    def with_where(self, where):
+        self.where = where
+        return self
+
+    def with_meta_count(self):
+        return self
+
+    def do(self):
+        with self.server.lock:
+            count = sum(evaluate(self.where, obj_id, stored["properties"]) for obj_id, stored in self.server.objects.items())
+        return {"data": {"Aggregate": {self.class_name: [{"meta": {"count": count}}]}}}
+
+
+class FakeQuery:
+    def __init__(self, server):
+        self.server = server
+
+    def get(self, class_name, properties):
+        return GetQuery(self.server, class_name, properties)
+
+    def aggregate(self, class_name):
+        return AggregateQuery(self.server, class_name)
+
+
+class FakeSchema:
+    def __init__(self, server):
+        self.server = server
+
+    def get(self, class_name=None):
+        return {"properties": [{"name": name} for name in self.server.property_names]}
+
+
+class FakeBatch:
+    def __init__(self, server):
+        self.server = server
+
+    def delete_objects(self, class_name, where, output="minimal", dry_run=False):
+        return self.server.batch_delete(class_name, where, output=output, dry_run=dry_run)
+
+
+class FakeClient:
+    def __init__(self, server):
+        self.query = FakeQuery(server)
+        self.schema = FakeSchema(server)
+        self.batch = FakeBatch(server)
+
+
+class HTTPError(Exception):
+    """Shaped like requests.HTTPError: the status is on .response"""
+
+    def __init__(self, status_code):
+        super().__init__(f"{status_code} error")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+class FakeWeaviate:
+    """One class worth of objects, reachable through .client and .session like a real server"""
+
+    def __init__(self, objects, delete_limit=10000, undeletable=()):
+        self.objects = {obj_id: {"properties": dict(properties), "vector": [float(len(obj_id))]}
+                        for obj_id, properties in objects.items()}
+        self.property_names = sorted({name for properties in objects.values() for name in properties})
+        self.delete_limit = delete_limit
+        # Ids whose delete fails, the way a locked shard would report it
+        self.undeletable = set(undeletable)
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.requests = {"graphql": 0, "batch_objects": 0, "batch_delete": 0, "patch": 0}
+        self.client = FakeClient(self)
+        self.session = self
+
+    def properties(self, obj_id):
+        return self.objects[obj_id]["properties"]
+
+    # WeaviateSession surface
+
+    def graphql(self, query):
+        self.requests["graphql"] += 1
+        return query.do()
+
+    def batch_objects(self, objects):
+        with self.lock:
+            self.requests["batch_objects"] += 1
+            for obj in objects:
+                self.objects[obj["id"]] = {"properties": dict(obj["properties"]), "vector": obj["vector"]}
+        return [{"id": obj["id"], "result": {}} for obj in objects]
+
+    def batch_delete(self, class_name, where, output="minimal", dry_run=False):
+        with self.lock:
+            self.requests["batch_delete"] += 1
+            matches = [obj_id for obj_id in sorted(self.objects)
+                       if evaluate(where, obj_id, self.objects[obj_id]["properties"])][:self.delete_limit]
+            objects = []
+            for obj_id in matches:
+                if dry_run:
+                    objects.append({"id": obj_id, "status": "DRYRUN"})
+                elif obj_id in self.undeletable:
+                    objects.append({"id": obj_id, "status": "FAILED", "errors": {"error": [{"message": "shard is read-only"}]}})
+                else:
+                    del self.objects[obj_id]
+                    objects.append({"id": obj_id, "status": "SUCCESS"})
+        failed = sum(obj["status"] == "FAILED" for obj in objects)
+        return {"results": {"matches": len(matches), "limit": self.delete_limit,
+                            "successful": 0 if dry_run else len(matches) - failed, "failed": failed,
+                            "objects": objects if output == "verbose" else None}}
+
+    def patch_object(self, class_name, object_id, properties):
+        with self.lock:
+            self.requests["patch"] += 1
+            if object_id not in self.objects:
+                raise HTTPError(404)
+            self.objects[object_id]["properties"].update(properties)
+
+    def close(self):
+        pass
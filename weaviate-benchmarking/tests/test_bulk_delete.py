@@ -0,0 +1,50 @@
+from bulk_delete import delete_where
+from fakes import FakeWeaviate
+
+UDP = {"path": ["protocol"], "operator": "Equal", "valueText": "UDP"}
+
+
+def flows(count):
+    return {f"{i:08d}-0000-0000-0000-000000000000": {"frame_number": i, "protocol": "UDP" if i % 2 else "TCP"}
+            for i in range(count)}
+
+
+def protocols(server):
+    return {properties["protocol"] for properties in (stored["properties"] for stored in server.objects.values())}
+
+
+def test_requests_repeat_until_fewer_than_the_cap_match():
+    server = FakeWeaviate(flows(50), delete_limit=10)
+    stats = delete_where(server.client, "IPFlow", UDP)
+    assert (stats['requests'], stats['matched'], stats['deleted'], stats['failed']) == (3, 25, 25, 0)
+    assert len(server.objects) == 25 and protocols(server) == {"TCP"}
+
+
+def test_a_multiple_of_the_cap_needs_one_empty_request():
+    server = FakeWeaviate(flows(40), delete_limit=10)
+    stats = delete_where(server.client, "IPFlow", UDP)
+    assert (stats['requests'], stats['deleted']) == (3, 20)
+
+
+def test_dry_run_counts_without_deleting():
+    server = FakeWeaviate(flows(50), delete_limit=10)
+    stats = delete_where(server.client, "IPFlow", UDP, dry_run=True)
+    assert (stats['matched'], stats['requests'], stats['deleted']) == (25, 3, 0)
+    assert len(server.objects) == 50
+
+
+def test_max_requests_stops_early():
+    server = FakeWeaviate(flows(50), delete_limit=10)
+    stats = delete_where(server.client, "IPFlow", UDP, max_requests=1)
+    assert (stats['requests'], stats['deleted']) == (1, 10)
+    assert len(server.objects) == 40
+
+
+def test_failures_are_reported_by_id_and_stop_a_stuck_loop():
+    undeletable = [f"{i:08d}-0000-0000-0000-000000000000" for i in (1, 3)]
+    server = FakeWeaviate(flows(6), delete_limit=2, undeletable=undeletable)
+    stats = delete_where(server.client, "IPFlow", UDP, output="verbose")
+    # The two failing objects keep matching first, so no request makes progress
+    assert (stats['requests'], stats['deleted'], stats['failed']) == (1, 0, 2)
+    assert stats['failed_objects'] == [(object_id, "shard is read-only") for object_id in undeletable]
+    assert len(server.objects) == 6
@@ -0,0 +1,62 @@
+import pytest
+
+from bulk_update import patch_filter, update_where
+from fakes import FakeWeaviate
+
+PROTOCOL_TCP = {"path": ["protocol"], "operator": "Equal", "valueText": "TCP"}
+
+
+def test_single_property_patch_skips_objects_already_patched():
+    assert patch_filter(PROTOCOL_TCP, {"frame_length": 1500}) == {"operator": "And", "operands": [
+        PROTOCOL_TCP, {"path": ["frame_length"], "operator": "NotEqual", "valueInt": 1500}]}
+
+
+def test_multi_property_patch_matches_any_property_that_differs():
+    where = patch_filter(None, {"frame_length": 60, "protocol": "UDP", "ratio": 0.5, "flag": True})
+    assert where == {"operator": "Or", "operands": [
+        {"path": ["frame_length"], "operator": "NotEqual", "valueInt": 60},
+        {"path": ["protocol"], "operator": "NotEqual", "valueString": "UDP"},
+        {"path": ["ratio"], "operator": "NotEqual", "valueNumber": 0.5},
+        {"path": ["flag"], "operator": "NotEqual", "valueBoolean": True},
+    ]}
+
+
+def flows(count=60):
+    protocols = ["TCP", "UDP", "DNS"]
+    return {f"{i:08d}-0000-0000-0000-000000000000": {"frame_number": i, "protocol": protocols[i % 3], "frame_length": 100 + i}
+            for i in range(count)}
+
+
+@pytest.mark.parametrize("write", ["batch", "patch"])
+def test_update_where_patches_only_matching_objects(write):
+    server = FakeWeaviate(flows())
+    vectors = {obj_id: obj["vector"] for obj_id, obj in server.objects.items()}
+    stats = update_where(server.client, "IPFlow", PROTOCOL_TCP, {"frame_length": 1500}, page_size=7, num_workers=3,
+                         session=server.session, write=write, verbose=False)
+
+    assert stats['updated'] == stats['matched'] == 20 and stats['failed'] == 0
+    for obj_id, obj in server.objects.items():
+        expected = 1500 if obj["properties"]["protocol"] == "TCP" else 100 + obj["properties"]["frame_number"]
+        assert obj["properties"]["frame_length"] == expected
+        assert obj["vector"] == vectors[obj_id]
+    if write == "batch":
+        assert server.requests["patch"] == 0 and server.requests["batch_objects"] == 9  # one per cursor page
+    else:
+        assert server.requests["patch"] == 20 and server.requests["batch_objects"] == 0
+
+
+def test_update_where_skips_objects_already_patched():
+    server = FakeWeaviate(flows())
+    update_where(server.client, "IPFlow", PROTOCOL_TCP, {"frame_length": 1500}, session=server.session, verbose=False)
+    stats = update_where(server.client, "IPFlow", PROTOCOL_TCP, {"frame_length": 1500}, session=server.session, verbose=False)
+    assert stats['scanned'] == 60 and stats['matched'] == 0
+
+
+def test_revectorized_pages_carry_new_vectors():
+    server = FakeWeaviate(flows())
+    update_where(server.client, "IPFlow", PROTOCOL_TCP, {"frame_length": 1500}, page_size=10, session=server.session,
+                 revectorize=lambda objects: [[float(obj['properties']['frame_length'])] for obj in objects], verbose=False)
+    assert all(obj["vector"] == [1500.0] for obj in server.objects.values() if obj["properties"]["protocol"] == "TCP")
+    with pytest.raises(ValueError):
+        update_where(server.client, "IPFlow", PROTOCOL_TCP, {"frame_length": 1}, session=server.session,
+                     revectorize=lambda objects: [], write="patch")
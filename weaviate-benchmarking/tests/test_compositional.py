@@ -0,0 +1,59 @@
+import numpy as np
+
+from compositional import FIELD_PHRASES, CompositionalEmbedder
+from embedders import HashEmbedder
+
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self, dimension=64):
+        super().__init__(dimension)
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64):
+        self.encoded.extend([texts] if isinstance(texts, str) else texts)
+        return super().encode(texts, batch_size=batch_size)
+
+
+def row(frame_number, source_ip="10.0.0.1", protocol="TCP"):
+    return {"frame_number": frame_number, "frame_time": f"t{frame_number}", "source_ip": source_ip,
+            "destination_ip": "10.0.0.2", "source_port": 51000, "destination_port": 443,
+            "protocol": protocol, "frame_length": 60}
+
+
+def test_row_vector_is_the_normalised_weighted_sum_of_field_vectors():
+    base = HashEmbedder(64)
+    flow = row(1)
+    expected = sum(weight * base.encode(template.format(flow[field])) for field, template, weight in FIELD_PHRASES)
+    vector = CompositionalEmbedder(base).encode_flows([flow])[0]
+    np.testing.assert_allclose(vector, expected / np.linalg.norm(expected), rtol=1e-5, atol=1e-6)
+
+
+def test_each_distinct_field_value_is_encoded_once():
+    base = CountingEmbedder()
+    embedder = CompositionalEmbedder(base)
+    first = embedder.encode_flows([row(i) for i in range(1, 51)])
+    assert len(base.encoded) == len(FIELD_PHRASES)
+    second = embedder.encode_flows([row(51, protocol="UDP")])
+    # Only the new protocol phrase reaches the base model; the rest are cache hits
+    assert base.encoded[len(FIELD_PHRASES):] == ["protocol UDP"]
+    assert np.allclose(first[0], first[49]) and not np.allclose(first[0], second[0])
+    stats = embedder.stats()
+    assert (stats['misses'], stats['entries']) == (len(FIELD_PHRASES) + 1, len(FIELD_PHRASES) + 1)
+
+
+def test_table_is_bounded_with_least_recently_used_eviction():
+    base = CountingEmbedder()
+    embedder = CompositionalEmbedder(base, max_entries=len(FIELD_PHRASES))
+    embedder.encode_flows([row(1, source_ip="10.0.0.1")])
+    embedder.encode_flows([row(2, source_ip="10.0.0.9")])
+    # The other five phrases were just used again, so the old source is the least recent
+    assert len(embedder.table) == len(FIELD_PHRASES) and embedder.evictions == 1
+    assert "source 10.0.0.1" not in embedder.table and "source 10.0.0.9" in embedder.table
+    # Vectors come back the same after an evicted value is re-encoded
+    again = embedder.encode_flows([row(3, source_ip="10.0.0.1")])
+    np.testing.assert_allclose(again, CompositionalEmbedder(HashEmbedder(64)).encode_flows([row(1)]), rtol=1e-6)
+
+
+def test_free_text_goes_to_the_base_model():
+    base = HashEmbedder(64)
+    np.testing.assert_array_equal(CompositionalEmbedder(base).encode(["protocol TCP"]), base.encode(["protocol TCP"]))
@@ -0,0 +1,95 @@
+import os
+import socket
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from embed_server import EmbeddingServer, RemoteEmbedder, connect_embedder
+from embedders import HashEmbedder
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets only")
+
+TEXTS = ["TCP 10.0.0.1:443 -> 10.0.0.2:51000", "DNS query for example.com", ""]
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, which pytest's tmp_path can exceed
+    directory = tempfile.mkdtemp(prefix="embed-")
+    yield os.path.join(directory, "embed.sock")
+    for name in os.listdir(directory):
+        os.unlink(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+@pytest.fixture
+def server(socket_path):
+    server = EmbeddingServer(socket_path, max_wait_ms=50.0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_vectors_match_the_local_embedder(server, socket_path):
+    remote = connect_embedder("hash", None, 32, socket_path=socket_path)
+    try:
+        assert (remote.name, remote.get_sentence_embedding_dimension()) == ("hash-32", 32)
+        local = HashEmbedder(32)
+        np.testing.assert_array_equal(remote.encode(TEXTS), local.encode(TEXTS))
+        np.testing.assert_array_equal(remote.encode(TEXTS[0]), local.encode(TEXTS[0]))
+        assert remote.count_tokens(TEXTS) == local.count_tokens(TEXTS)
+    finally:
+        remote.close()
+
+
+def test_concurrent_requests_share_encode_calls(server, socket_path):
+    clients = [RemoteEmbedder("hash", None, 16, socket_path) for _ in range(8)]
+    results = {}
+
+    def encode(index):
+        results[index] = clients[index].encode([f"request {index}"])
+
+    threads = [threading.Thread(target=encode, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close()
+
+    for index in range(8):
+        np.testing.assert_array_equal(results[index], HashEmbedder(16).encode([f"request {index}"]))
+    stats = server.stats()["hash-16"]
+    assert stats['requests'] == 8 and stats['texts'] == 8
+    assert stats['encode_calls'] < 8
+
+
+def test_errors_come_back_and_keep_the_connection(server, socket_path):
+    remote = RemoteEmbedder("hash", None, 16, socket_path)
+    try:
+        with pytest.raises(RuntimeError, match="Unknown op"):
+            remote._request("reverse")
+        assert remote.encode(["still works"]).shape == (1, 16)
+    finally:
+        remote.close()
+    with pytest.raises(RuntimeError, match="Unknown embedder backend"):
+        RemoteEmbedder("no-such-backend", None, 16, socket_path)
+
+
+def test_connect_falls_back_without_a_daemon(socket_path):
+    assert connect_embedder("hash", None, 16, socket_path=socket_path) is None
+    assert connect_embedder("hash", None, 16, socket_path=None) is None
+
+
+def test_stale_socket_is_replaced_but_a_live_one_is_not(server, socket_path):
+    with pytest.raises(RuntimeError, match="already listening"):
+        EmbeddingServer(socket_path)
+    server.shutdown()
+    server.server_close()
+    # The file a crashed server leaves behind no longer accepts connections
+    replacement = EmbeddingServer(socket_path)
+    replacement.server_close()
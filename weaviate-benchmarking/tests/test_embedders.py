@@ -0,0 +1,22 @@
+import numpy as np
+
+from embedders import HashEmbedder
+
+TEXT = "TCP 10.0.0.1:443 -> 10.0.0.2:51000 1514 bytes"
+
+
+def test_hash_embedder_output_is_pinned():
+    # CRC32 buckets, so the same text maps to the same vector in every process and release
+    expected = np.array([0, 0, 0, 0, -3, 0, -1, -1, -1, 1, 1, 0, 0, 0, -1, 0], dtype=np.float32) / np.sqrt(15)
+    np.testing.assert_allclose(HashEmbedder(16).encode(TEXT), expected, rtol=1e-6)
+
+
+def test_hash_embedder_batches_match_single_texts():
+    embedder = HashEmbedder(64)
+    texts = [TEXT, "UDP 10.0.0.3:53 -> 10.0.0.4:40000 80 bytes", ""]
+    vectors = embedder.encode(texts)
+    assert vectors.shape == (3, 64) and vectors.dtype == np.float32
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_array_equal(embedder.encode(text), vector)
+    np.testing.assert_allclose(np.linalg.norm(vectors[:2], axis=1), 1.0, rtol=1e-6)
+    assert not vectors[2].any()
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+DIMENSION = 4
+# Room for exactly three vectors
+THREE_SLOTS_MB = 3 * DIMENSION * 4 / (1024 * 1024)
+
+
+def open_cache(directory):
+    return EmbeddingCache(str(directory), "test/model", DIMENSION, max_mb=THREE_SLOTS_MB)
+
+
+def vector(value):
+    return np.full((1, DIMENSION), value, dtype=np.float32)
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = open_cache(tmp_path)
+    assert cache.max_entries == 3
+    for value, text in enumerate(["a", "b", "c"]):
+        cache.put_many([text], vector(value))
+    cache.get_many(["a"])  # "b" is now the oldest
+    cache.put_many(["d"], vector(9))
+
+    found, missing = cache.get_many(["a", "b", "c", "d"])
+    assert missing == [1]
+    assert found[3][0] == 9 and found[0][0] == 0
+    assert cache.stats()['evictions'] == 1
+
+
+def test_saved_cache_reloads_with_its_vectors(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put_many(["a", "b"], np.vstack([vector(1), vector(2)]))
+    cache.save()
+
+    reloaded = open_cache(tmp_path)
+    found, missing = reloaded.get_many(["b", "a", "z"])
+    assert missing == [2]
+    assert found[0][0] == 2 and found[1][0] == 1
+
+
+def test_cache_written_after_its_last_save_is_discarded(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put_many(["a", "b", "c"], np.vstack([vector(1), vector(2), vector(3)]))
+    cache.save()
+    # Evicts "a" and reuses its slot, then the process dies before save()
+    cache.put_many(["d"], vector(4))
+    assert os.path.exists(cache.dirty_path)
+
+    reloaded = open_cache(tmp_path)
+    assert len(reloaded) == 0
+    found, missing = reloaded.get_many(["a"])
+    assert not found and missing == [0]
+
+
+def test_encode_only_computes_misses(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put_many(["a"], vector(1))
+    computed = []
+
+    def encode_missing(texts):
+        computed.extend(texts)
+        return np.vstack([vector(7) for _ in texts])
+
+    vectors = cache.encode(["a", "b"], encode_missing)
+    assert computed == ["b"]
+    np.testing.assert_array_equal(vectors[:, 0], [1, 7])
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from features import BLOCKS, FEATURE_DIMENSION, flow_feature_vectors, query_feature_vector
+
+
+def row(**overrides):
+    flow = {"frame_number": 1, "frame_time": "Feb  9, 2025 01:29:22.694218255 UTC", "source_ip": "10.0.0.1",
+            "destination_ip": "192.168.1.20", "source_port": 51000, "destination_port": 443,
+            "protocol": "TCP", "frame_length": 1514}
+    return {**flow, **overrides}
+
+
+def block(vectors, name):
+    start = 0
+    for block_name, width, _ in BLOCKS:
+        if block_name == name:
+            return vectors[..., start:start + width]
+        start += width
+    raise KeyError(name)
+
+
+def test_vectors_are_unit_length_and_stable():
+    rows = [row(), row(protocol="DNS", destination_port=53, frame_length=80), row(source_ip="not an ip", frame_time="")]
+    vectors = flow_feature_vectors(rows)
+    assert vectors.shape == (3, FEATURE_DIMENSION)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    # Vectors only depend on the row, not on what else is in the chunk
+    assert np.allclose(flow_feature_vectors(rows[1:2]), vectors[1:2])
+
+
+def test_similar_flows_are_closer():
+    base, same_service, other_service = flow_feature_vectors(
+        [row(), row(source_ip="10.0.0.7", source_port=51999), row(protocol="DNS", destination_port=53, frame_length=80)])
+    assert base @ same_service > base @ other_service
+
+
+def test_query_populates_only_the_given_fields():
+    query = query_feature_vector(protocol="dns", destination_port=53)
+    assert np.isclose(np.linalg.norm(query), 1.0)
+    assert not block(query, "source_octets").any() and not block(query, "frame_length").any()
+    dns, tcp = flow_feature_vectors([row(protocol="DNS", destination_port=53), row()])
+    assert query @ dns > query @ tcp
+
+
+def test_empty_query_is_rejected():
+    with pytest.raises(ValueError):
+        query_feature_vector()
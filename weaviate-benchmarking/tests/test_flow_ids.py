@@ -0,0 +1,20 @@
+from flow_ids import aggregate_flow_uuid, default_dataset_id, ip_flow_uuid
+
+FLOW = {"source_ip": "10.0.0.1", "destination_ip": "10.0.0.2", "source_port": 443, "destination_port": 51000, "protocol": "TCP"}
+
+
+def test_ip_flow_uuid_is_stable_across_runs():
+    # Changing this breaks resume and key-addressed updates of existing datasets
+    assert ip_flow_uuid("ip_flows", 17) == "7c9bbbc6-3662-560a-bb92-3c4344db5fd3"
+
+
+def test_ids_depend_on_dataset_and_key():
+    assert ip_flow_uuid("a", 1) == ip_flow_uuid("a", 1)
+    assert ip_flow_uuid("a", 1) != ip_flow_uuid("a", 2)
+    assert ip_flow_uuid("a", 1) != ip_flow_uuid("b", 1)
+    assert aggregate_flow_uuid("a", FLOW) == aggregate_flow_uuid("a", dict(FLOW, frame_length=99))
+    assert aggregate_flow_uuid("a", FLOW) != aggregate_flow_uuid("a", dict(FLOW, source_port=444))
+
+
+def test_default_dataset_id_is_the_file_stem():
+    assert default_dataset_id("/data/captures/ip_flows.csv") == "ip_flows"
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from flow_reader import read_ip_flow_chunks
+from generate import generate_ip_flows
+
+CSV = '''"frame.number","frame.time","ip.src","ip.dst","tcp.srcport","tcp.dstport","_ws.col.protocol","frame.len"
+"1","Feb  9, 2025 01:29:22.694218255 UTC","10.0.0.1","10.0.0.2","51000","443","tls","1514"
+"2","Feb  9, 2025 01:29:22.694318255 UTC","10.0.0.2","10.0.0.1","","","dns ","82"
+"3","Feb  9, 2025 01:29:22.694418255 UTC","10.0.0.1","10.0.0.3","x","22","SSH","66"
+'''
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    path = tmp_path / "flows.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_rows_are_typed_and_renamed(small_csv):
+    rows = [row for chunk in read_ip_flow_chunks(small_csv, 2) for row in chunk]
+    assert rows[0] == {"frame_number": 1, "frame_time": "Feb  9, 2025 01:29:22.694218255 UTC", "source_ip": "10.0.0.1",
+                       "destination_ip": "10.0.0.2", "source_port": 51000, "destination_port": 443,
+                       "protocol": "TLS", "frame_length": 1514}
+    # Blank and non-numeric ports become 0, protocols are stripped and upper-cased
+    assert (rows[1]["source_port"], rows[1]["destination_port"], rows[1]["protocol"]) == (0, 0, "DNS")
+    assert rows[2]["source_port"] == 0
+
+
+def test_chunks_skip_rows_and_progress(small_csv):
+    progress = {}
+    chunks = list(read_ip_flow_chunks(small_csv, 2, progress=progress))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert progress == {"rows_read": 3, "bytes_read": os.path.getsize(small_csv)}
+    resumed = [row["frame_number"] for chunk in read_ip_flow_chunks(small_csv, 2, skip_rows=2) for row in chunk]
+    assert resumed == [3]
+
+
+@pytest.mark.parametrize("skip_rows", [0, 250, 300, 999])
+def test_parquet_yields_the_csv_rows(tmp_path, skip_rows):
+    pytest.importorskip("pyarrow")
+    generate_ip_flows(str(tmp_path / "flows.csv"), 1000, num_hosts=20)
+    generate_ip_flows(str(tmp_path / "flows.parquet"), 1000, num_hosts=20)
+    progress = {}
+    from_csv = [row for chunk in read_ip_flow_chunks(str(tmp_path / "flows.csv"), 300, skip_rows=skip_rows) for row in chunk]
+    from_parquet = [row for chunk in read_ip_flow_chunks(str(tmp_path / "flows.parquet"), 300, progress=progress,
+                                                         skip_rows=skip_rows) for row in chunk]
+    assert from_parquet == from_csv
+    assert [row["frame_number"] for row in from_csv] == list(range(skip_rows + 1, 1001))
+    assert progress.get("rows_read", 0) == 1000 - skip_rows
@@ -0,0 +1,37 @@
+import numpy as np
+
+from flow_text import FLOW_TEXT_TEMPLATES, TEMPLATE_FIELDS, template_fields
+from query import flow_reembedder
+
+ROW = {
+    "frame_number": 17, "frame_time": "Feb  9, 2025 01:29:22.000049732 UTC", "source_ip": "10.0.0.1",
+    "destination_ip": "10.0.0.2", "source_port": 443, "destination_port": 51000, "protocol": "TCP", "frame_length": 1514,
+}
+
+
+def test_template_fields_match_what_each_template_renders():
+    for name, text_builder in FLOW_TEXT_TEMPLATES.items():
+        text = text_builder(ROW)
+        for field in TEMPLATE_FIELDS[name]:
+            changed = text_builder(dict(ROW, **{field: "CHANGED"}))
+            assert changed != text, f"{name} does not use {field}"
+        for field in set(ROW) - TEMPLATE_FIELDS[name]:
+            assert text_builder(dict(ROW, **{field: "CHANGED"})) == text, f"{name} uses {field}"
+
+
+def test_template_fields_follow_the_builder():
+    assert template_fields(lambda flow_data: f"{flow_data['protocol']} {flow_data['frame_length']}") == {"protocol", "frame_length"}
+
+
+def test_reembedder_skips_fields_outside_the_template():
+    assert flow_reembedder({"frame_time": "later"}, flow_template="no-timestamp") is None
+
+
+def test_reembedder_rebuilds_vectors_for_template_fields():
+    class Encoder:
+        def encode(self, texts, batch_size=64):
+            return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    reembed = flow_reembedder({"frame_length": 60}, flow_template="compact", embed_model=Encoder())
+    objects = [{"id": "a", "properties": dict(ROW, frame_length=60), "vector": None}]
+    assert reembed(objects) == [[float(len(FLOW_TEXT_TEMPLATES["compact"](objects[0]["properties"])))]]
@@ -0,0 +1,41 @@
+from flow_ids import aggregate_flow_uuid
+from flows import aggregate_flows, build_aggregated_flow_text
+
+
+def packet(frame_number, frame_length, source_port=51000, protocol="TCP"):
+    return {"frame_number": frame_number, "frame_time": f"t{frame_number}", "source_ip": "10.0.0.1",
+            "destination_ip": "10.0.0.2", "source_port": source_port, "destination_port": 443,
+            "protocol": protocol, "frame_length": frame_length}
+
+
+def test_packets_fold_into_five_tuple_flows():
+    flows = aggregate_flows([[packet(1, 60), packet(2, 1514), packet(3, 60, source_port=52000)],
+                             [packet(4, 90), packet(5, 80, protocol="UDP")]])
+    assert len(flows) == 3
+    flow = flows[("10.0.0.1", "10.0.0.2", 51000, 443, "TCP")]
+    assert flow["packet_count"] == 3
+    assert flow["total_bytes"] == 1664
+    assert (flow["min_frame_length"], flow["max_frame_length"]) == (60, 1514)
+    assert flow["mean_frame_length"] == 1664 / 3
+    assert (flow["first_frame_number"], flow["last_frame_number"]) == (1, 4)
+    assert (flow["first_time"], flow["last_time"]) == ("t1", "t4")
+
+
+def test_out_of_order_packets_and_incremental_folding():
+    flows = aggregate_flows([[packet(7, 100)]])
+    aggregate_flows([[packet(3, 200), packet(9, 300)]], flows)
+    (flow,) = flows.values()
+    assert (flow["first_frame_number"], flow["first_time"]) == (3, "t3")
+    assert (flow["last_frame_number"], flow["last_time"]) == (9, "t9")
+    assert flow["packet_count"] == 3
+
+
+def test_flow_text_and_id():
+    (flow,) = aggregate_flows([[packet(1, 60), packet(2, 100)]]).values()
+    text = build_aggregated_flow_text(flow)
+    assert "10.0.0.1 to 10.0.0.2 using TCP protocol on ports 51000 -> 443" in text
+    assert "2 packets and 160 bytes between t1 and t2" in text
+    assert "(mean 80.0)" in text
+    # The id is the flow key, so a later packet of the same flow does not change it
+    (grown,) = aggregate_flows([[packet(1, 60), packet(2, 100), packet(3, 70)]]).values()
+    assert aggregate_flow_uuid("capture", flow) == aggregate_flow_uuid("capture", grown)
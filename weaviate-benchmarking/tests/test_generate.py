@@ -0,0 +1,53 @@
+import csv
+
+import pytest
+
+from generate import CSV_HEADER, PROTOCOL_MIX, generate_ip_flows
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_same_seed_same_file(tmp_path):
+    first, second, other_seed = tmp_path / "first.csv", tmp_path / "second.csv", tmp_path / "other.csv"
+    generate_ip_flows(str(first), 500, seed=7, num_hosts=50, chunk_size=64)
+    generate_ip_flows(str(second), 500, seed=7, num_hosts=50, chunk_size=64)
+    generate_ip_flows(str(other_seed), 500, seed=8, num_hosts=50, chunk_size=64)
+    assert first.read_bytes() == second.read_bytes()
+    assert other_seed.read_bytes() != first.read_bytes()
+
+
+def test_tshark_layout(tmp_path):
+    path = tmp_path / "flows.csv"
+    generate_ip_flows(str(path), 1000, num_hosts=20, chunk_size=300)
+    header, *rows = read_rows(path)
+    assert header == CSV_HEADER
+    assert [int(row[0]) for row in rows] == list(range(1, 1001))
+    lengths = {name: (low, high) for name, _, _, _, (low, high) in PROTOCOL_MIX}
+    tcp = {name for name, _, over_tcp, _, _ in PROTOCOL_MIX if over_tcp}
+    for row in rows:
+        protocol, length = row[6], int(row[7])
+        assert lengths[protocol][0] <= length <= lengths[protocol][1]
+        assert row[2] != row[3]
+        # tshark leaves the tcp.* columns empty for everything not carried over TCP
+        assert (row[4] != "" and row[5] != "") == (protocol in tcp)
+
+
+def test_parquet_matches_csv(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    generate_ip_flows(str(tmp_path / "flows.csv"), 200, num_hosts=20)
+    generate_ip_flows(str(tmp_path / "flows.parquet"), 200, num_hosts=20)
+    from_csv = pd.read_csv(tmp_path / "flows.csv", dtype=str, keep_default_na=False)
+    from_parquet = pd.read_parquet(tmp_path / "flows.parquet").astype(str)
+    pd.testing.assert_frame_equal(from_csv, from_parquet)
+
+
+@pytest.mark.parametrize("rows, chunk_size", [(0, 100), (-5, 100), (10, 0)])
+def test_non_positive_sizes_are_rejected_before_writing(tmp_path, rows, chunk_size):
+    path = tmp_path / "flows.csv"
+    with pytest.raises(ValueError):
+        generate_ip_flows(str(path), rows, chunk_size=chunk_size)
+    assert not path.exists()
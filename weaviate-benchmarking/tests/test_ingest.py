@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from weaviate.exceptions import ObjectAlreadyExistsException
+
+import ingest
+from embedders import HashEmbedder
+
+HEADER = "frame.number,frame.time,ip.src,ip.dst,tcp.srcport,tcp.dstport,_ws.col.protocol,frame.len\n"
+ROWS = 40
+
+
+class Crash(BaseException):
+    """Ends the run the way a kill would: nothing in ingest handles it"""
+
+
+class FakeDataObjects:
+    """data_object.create/replace with the v3 client's duplicate-id behaviour"""
+
+    def __init__(self, crash_after=None):
+        self.objects = {}
+        self.crash_after = crash_after
+        self.replaced = 0
+
+    def create(self, data_object, class_name, uuid=None, vector=None):
+        if self.crash_after is not None and len(self.objects) >= self.crash_after:
+            raise Crash()
+        if uuid in self.objects:
+            raise ObjectAlreadyExistsException(str(uuid))
+        self.objects[uuid] = data_object
+
+    def replace(self, data_object, class_name, uuid=None, vector=None):
+        self.objects[uuid] = data_object
+        self.replaced += 1
+
+
+class FakeClient:
+    def __init__(self, data_object):
+        self.data_object = data_object
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch):
+    # The monitoring logs are tracked files next to the scripts
+    monkeypatch.setattr(ingest, "save_process_logs", lambda: None)
+    path = tmp_path / "capture.csv"
+    path.write_text(HEADER + "".join(
+        f'"{i}","Feb  9, 2025 01:29:22.{i:09d} UTC","10.0.0.{i % 7}","10.0.1.{i % 5}","{1000 + i}","443","TCP","{60 + i}"\n'
+        for i in range(1, ROWS + 1)))
+    return path
+
+
+def test_resume_after_crash_overwrites_resent_rows(capture, tmp_path):
+    checkpoint_file = str(tmp_path / "capture.checkpoint.json")
+    data_objects = FakeDataObjects(crash_after=13)
+    options = dict(chunk_size=4, checkpoint_every=4, checkpoint_file=checkpoint_file, embed_model=HashEmbedder(8))
+
+    with pytest.raises(Crash):
+        ingest.insert_ip_flows(str(capture), client=FakeClient(data_objects), **options)
+    with open(checkpoint_file) as f:
+        assert json.load(f)["rows_committed"] == 12
+
+    # Row 13 was stored before the crash but is past the checkpoint, so it is sent again
+    data_objects.crash_after = None
+    ingest.insert_ip_flows(str(capture), client=FakeClient(data_objects), resume=True, **options)
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    assert checkpoint["complete"] and checkpoint["rows_committed"] == ROWS
+    assert len(data_objects.objects) == ROWS
+    assert data_objects.replaced == 1
+
+
+def test_failed_rows_hold_the_checkpoint_back(capture, tmp_path):
+    checkpoint_file = str(tmp_path / "capture.checkpoint.json")
+    data_objects = FakeDataObjects()
+    create = data_objects.create
+
+    def create_failing_frame_9(data_object, class_name, uuid=None, vector=None):
+        if data_object["frame_number"] == 9:
+            raise RuntimeError("500 internal error")
+        create(data_object, class_name, uuid=uuid, vector=vector)
+
+    data_objects.create = create_failing_frame_9
+    ingest.insert_ip_flows(str(capture), chunk_size=4, checkpoint_every=4, checkpoint_file=checkpoint_file,
+                           embed_model=HashEmbedder(8), client=FakeClient(data_objects))
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    assert not checkpoint["complete"]
+    assert checkpoint["rows_committed"] == 8
@@ -0,0 +1,58 @@
+import pytest
+
+from fakes import FakeWeaviate
+from keyed_crud import parse_key_ranges, patch_by_ids
+
+
+def test_single_keys_ranges_and_lists():
+    assert parse_key_ranges(["17", "3-5", "9,1, 4"]) == [1, 3, 4, 5, 9, 17]
+
+
+def test_ranges_are_inclusive_and_deduplicated():
+    assert parse_key_ranges(["2-4", "4-6", 3]) == [2, 3, 4, 5, 6]
+
+
+def test_empty_range_is_rejected():
+    with pytest.raises(ValueError):
+        parse_key_ranges(["10-2"])
+
+
+def test_key_limit_is_checked_before_expanding():
+    with pytest.raises(ValueError):
+        parse_key_ranges(["0-100000000"])
+    with pytest.raises(ValueError):
+        parse_key_ranges(["1-3", "7,8"], max_keys=4)
+    assert len(parse_key_ranges(["0-199999"], max_keys=None)) == 200000
+
+
+def object_id(frame_number):
+    return f"{frame_number:08d}-0000-0000-0000-000000000000"
+
+
+def frames(count=25):
+    return {object_id(i): {"frame_number": i, "frame_length": 100 + i} for i in range(count)}
+
+
+def test_patch_by_ids_batches_upserts_and_keeps_vectors():
+    server = FakeWeaviate(frames())
+    vectors = {obj_id: stored["vector"] for obj_id, stored in server.objects.items()}
+    ids = [object_id(i) for i in range(0, 30, 2)]  # 26 and 28 were never ingested
+    stats = patch_by_ids(server.client, "IPFlow", ids, {"frame_length": 9000}, batch_size=4, num_workers=3,
+                         session=server.session, verbose=False)
+    assert (stats['updated'], stats['missing'], stats['failed']) == (13, 2, 0)
+    assert server.requests == {"graphql": 4, "batch_objects": 4, "batch_delete": 0, "patch": 0}
+    for i in range(25):
+        stored = server.objects[object_id(i)]
+        assert stored["properties"] == {"frame_number": i, "frame_length": 9000 if i % 2 == 0 else 100 + i}
+        assert stored["vector"] == vectors[object_id(i)]
+    assert object_id(26) not in server.objects
+
+
+def test_patch_by_ids_patch_mode_merges_per_object():
+    server = FakeWeaviate(frames())
+    ids = [object_id(i) for i in (1, 2, 3, 99)]
+    stats = patch_by_ids(server.client, "IPFlow", ids, {"frame_length": 0}, batch_size=10, session=server.session,
+                         write="patch", verbose=False)
+    assert (stats['updated'], stats['missing']) == (3, 1)
+    assert server.requests["patch"] == 3 and server.requests["batch_objects"] == 0
+    assert [server.properties(object_id(i))["frame_length"] for i in (0, 1, 2, 3)] == [100, 0, 0, 0]
@@ -0,0 +1,108 @@
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+from parallel import WeaviateSession, run_operations
+
+
+class ConcurrencyProbe:
+    """Operations that record how many of them are running at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def operation(self, value, fail=False):
+        def run():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                time.sleep(0.002)
+                if fail:
+                    raise RuntimeError(f"failed {value}")
+                return value
+            finally:
+                with self.lock:
+                    self.running -= 1
+        return run
+
+
+@pytest.mark.parametrize("mode", ["threads", "asyncio"])
+def test_results_and_errors_keep_submission_order(mode):
+    probe = ConcurrencyProbe()
+    operations = ((f"op {i}", probe.operation(i, fail=i % 5 == 0)) for i in range(40))
+    stats = run_operations(operations, num_workers=4, mode=mode)
+
+    assert stats['operations'] == 40
+    assert stats['failed'] == 8
+    assert stats['results'] == [i for i in range(40) if i % 5]
+    assert [(index, key) for index, key, _ in stats['errors']] == [(i, f"op {i}") for i in range(0, 40, 5)]
+    assert all(isinstance(error, RuntimeError) for _, _, error in stats['errors'])
+
+
+@pytest.mark.parametrize("mode", ["threads", "asyncio"])
+def test_in_flight_cap_bounds_concurrency(mode):
+    probe = ConcurrencyProbe()
+    operations = ((i, probe.operation(i)) for i in range(30))
+    run_operations(operations, num_workers=8, max_in_flight=3, mode=mode)
+    assert 1 <= probe.peak <= 3
+
+
+@pytest.mark.parametrize("mode", ["threads", "asyncio"])
+def test_per_worker_stats_add_up(mode):
+    probe = ConcurrencyProbe()
+    stats = run_operations(((i, probe.operation(i, fail=i == 3)) for i in range(12)), num_workers=3, mode=mode)
+    workers = stats['workers'].values()
+    assert 1 <= len(workers) <= 3
+    assert sum(worker['operations'] for worker in workers) == 12
+    assert sum(worker['failed'] for worker in workers) == 1
+    assert all(worker['latency_ms_p95'] >= worker['latency_ms_p50'] > 0 for worker in workers)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        run_operations([], mode="processes")
+
+
+class RecordingHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every request with an empty JSON body and records its headers"""
+    seen = []
+
+    def _reply(self):
+        RecordingHandler.seen.append((self.command, self.path, dict(self.headers)))
+        body = json.dumps({"version": "1.27.0", "data": {}}).encode()
+        # 404 on the OIDC discovery URL: the server has no OIDC configured
+        self.send_response(404 if "openid" in self.path else 200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def test_session_from_client_keeps_auth_and_module_headers():
+    weaviate = pytest.importorskip("weaviate")
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = weaviate.Client(f"http://127.0.0.1:{server.server_port}", auth_client_secret=weaviate.AuthApiKey("secret-key"),
+                                 additional_headers={"X-OpenAI-Api-Key": "sk-test"}, startup_period=None)
+        session = WeaviateSession.from_client(client, pool_size=2)
+        session.graphql("{ Get { IPFlow { frame_number } } }")
+        session.patch_object("IPFlow", "00000000-0000-0000-0000-000000000001", {"frame_length": 60})
+        session.close()
+    finally:
+        server.shutdown()
+    for method, path, headers in RecordingHandler.seen[-2:]:
+        headers = {name.lower(): value for name, value in headers.items()}
+        assert headers["authorization"] == "Bearer secret-key", (method, path)
+        assert headers["x-openai-api-key"] == "sk-test", (method, path)
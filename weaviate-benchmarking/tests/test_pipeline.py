@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import run_pipeline
+
+
+def test_every_chunk_reaches_upload_in_order():
+    uploaded = []
+    wall_seconds, stages = run_pipeline(range(50), lambda chunk: chunk * 2, uploaded.append, queue_size=2)
+    assert uploaded == [chunk * 2 for chunk in range(50)]
+    assert [stats['name'] for stats in stages] == ['reader', 'embed', 'upload']
+    assert [stats['items'] for stats in stages] == [50, 50, 50]
+    assert wall_seconds >= 0
+
+
+def test_stages_overlap():
+    def slow(seconds):
+        def work(chunk):
+            time.sleep(seconds)
+            return chunk
+        return work
+
+    # Serially this would take 10 x (0.02 + 0.02) seconds
+    wall_seconds, _ = run_pipeline(range(10), slow(0.02), slow(0.02), queue_size=2)
+    assert wall_seconds < 0.35
+
+
+def test_full_queues_hold_the_reader_back():
+    read = []
+    release = threading.Event()
+
+    def source():
+        for chunk in range(20):
+            read.append(chunk)
+            yield chunk
+
+    def upload(chunk):
+        release.wait()
+
+    thread = threading.Thread(target=run_pipeline, args=(source(), lambda chunk: chunk, upload), kwargs={'queue_size': 1})
+    thread.start()
+    time.sleep(0.3)
+    # At most one chunk in each stage and one in each queue, plus the one blocked on put
+    assert len(read) <= 5
+    release.set()
+    thread.join(timeout=5)
+    assert len(read) == 20
+
+
+@pytest.mark.parametrize("failing_stage", ["source", "embed", "upload"])
+def test_first_error_is_raised_and_stops_the_other_stages(failing_stage):
+    def source():
+        for chunk in range(1000):
+            if failing_stage == "source" and chunk == 3:
+                raise RuntimeError("source failed")
+            yield chunk
+
+    def embed(chunk):
+        if failing_stage == "embed" and chunk == 3:
+            raise RuntimeError("embed failed")
+        return chunk
+
+    def upload(chunk):
+        if failing_stage == "upload" and chunk == 3:
+            raise RuntimeError("upload failed")
+
+    start = time.time()
+    with pytest.raises(RuntimeError, match=f"{failing_stage} failed"):
+        run_pipeline(source(), embed, upload, queue_size=2)
+    assert time.time() - start < 2
@@ -0,0 +1,15 @@
+from fakes import FakeWeaviate
+from scan import scan_class
+
+
+def test_cursor_visits_every_id_once_in_pages():
+    server = FakeWeaviate({f"{i:04d}": {"frame_number": i} for i in range(25)})
+    stats = {}
+    pages = list(scan_class(server.client, "IPFlow", page_size=10, stats=stats))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [obj_id for page in pages for obj_id in page] == sorted(server.objects)
+    assert stats == {"pages": 3, "scanned": 25}
+
+
+def test_empty_class_yields_nothing():
+    assert list(scan_class(FakeWeaviate({}).client, "IPFlow")) == []